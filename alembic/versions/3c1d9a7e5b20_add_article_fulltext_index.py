@@ -0,0 +1,29 @@
+"""add article fulltext index
+
+Revision ID: 3c1d9a7e5b20
+Revises: 77a258654f9e
+Create Date: 2026-10-17 10:12:31.402518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1d9a7e5b20'
+down_revision: Union[str, None] = '77a258654f9e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ft_articles_title_content', 'articles', ['title', 'content'],
+        unique=False, mysql_prefix='FULLTEXT', mysql_with_parser='ngram'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ft_articles_title_content', table_name='articles')
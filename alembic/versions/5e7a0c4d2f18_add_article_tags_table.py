@@ -0,0 +1,46 @@
+"""add article_tags table
+
+Revision ID: 5e7a0c4d2f18
+Revises: 8b4f2e61c9d3
+Create Date: 2026-10-17 13:26:05.774120
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e7a0c4d2f18'
+down_revision: Union[str, None] = '8b4f2e61c9d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    article_tags = op.create_table('article_tags',
+    sa.Column('article_id', sa.Integer(), nullable=False),
+    sa.Column('tag', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('article_id', 'tag')
+    )
+    op.create_index('ix_article_tags_tag_article', 'article_tags', ['tag', 'article_id'], unique=False)
+
+    # 从articles.tags回填标签索引
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, tags FROM articles WHERE tags IS NOT NULL")).fetchall()
+    data = []
+    for article_id, tags in rows:
+        if isinstance(tags, str):
+            tags = json.loads(tags)
+        for tag in dict.fromkeys(t.strip() for t in tags or [] if t and t.strip()):
+            data.append({'article_id': article_id, 'tag': tag})
+    if data:
+        op.bulk_insert(article_tags, data)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_article_tags_tag_article', table_name='article_tags')
+    op.drop_table('article_tags')
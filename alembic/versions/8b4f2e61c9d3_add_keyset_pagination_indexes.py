@@ -0,0 +1,31 @@
+"""add keyset pagination indexes
+
+Revision ID: 8b4f2e61c9d3
+Revises: 3c1d9a7e5b20
+Create Date: 2026-10-17 11:03:47.215930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b4f2e61c9d3'
+down_revision: Union[str, None] = '3c1d9a7e5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_articles_created_at_id', 'articles', ['created_at', 'id'], unique=False)
+    op.create_index(
+        'ix_comments_article_parent_created', 'comments',
+        ['article_id', 'parent_id', 'created_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comments_article_parent_created', table_name='comments')
+    op.drop_index('ix_articles_created_at_id', table_name='articles')
@@ -0,0 +1,36 @@
+"""add hot query indexes
+
+Revision ID: a91d3f7c6e42
+Revises: 5e7a0c4d2f18
+Create Date: 2026-10-17 14:02:18.930417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91d3f7c6e42'
+down_revision: Union[str, None] = '5e7a0c4d2f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # comments的(article_id, parent_id, created_at, id)索引已在8b4f2e61c9d3中创建
+    op.create_index('ix_articles_title', 'articles', ['title'], unique=False)
+    op.create_index('ix_articles_author_id', 'articles', ['author_id'], unique=False)
+    op.create_index(
+        'ix_articles_category_status_created', 'articles',
+        ['category', 'status', 'created_at', 'id'], unique=False
+    )
+    op.create_index('ix_visits_created_at', 'visits', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_visits_created_at', table_name='visits')
+    op.drop_index('ix_articles_category_status_created', table_name='articles')
+    op.drop_index('ix_articles_author_id', table_name='articles')
+    op.drop_index('ix_articles_title', table_name='articles')
@@ -0,0 +1,55 @@
+"""add visit rollup tables
+
+Revision ID: b5d7f9a1c3e6
+Revises: e7b9d1f3a5c8
+Create Date: 2026-10-17 21:16:32.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d7f9a1c3e6'
+down_revision: Union[str, None] = 'e7b9d1f3a5c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'visit_hourly',
+        sa.Column('bucket', sa.DateTime(), nullable=False),
+        sa.Column('path', sa.String(length=200), nullable=False),
+        sa.Column('location', sa.String(length=200), nullable=False),
+        sa.Column('visit_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('bucket', 'path', 'location')
+    )
+    op.create_table(
+        'visit_daily',
+        sa.Column('bucket', sa.Date(), nullable=False),
+        sa.Column('path', sa.String(length=200), nullable=False),
+        sa.Column('location', sa.String(length=200), nullable=False),
+        sa.Column('visit_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('bucket', 'path', 'location')
+    )
+
+    # 根据已有访问记录回填汇总数据（与CRUDVisit.rebuild_rollups一致）
+    op.execute(
+        "INSERT INTO visit_hourly (bucket, path, location, visit_count) "
+        "SELECT DATE_FORMAT(created_at, '%Y-%m-%d %H:00:00') AS hour, "
+        "COALESCE(path, '') AS visit_path, COALESCE(location, '') AS visit_location, COUNT(id) "
+        "FROM visits GROUP BY hour, visit_path, visit_location"
+    )
+    op.execute(
+        "INSERT INTO visit_daily (bucket, path, location, visit_count) "
+        "SELECT DATE(bucket) AS day, path, location, SUM(visit_count) "
+        "FROM visit_hourly GROUP BY day, path, location"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('visit_daily')
+    op.drop_table('visit_hourly')
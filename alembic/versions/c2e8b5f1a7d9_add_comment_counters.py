@@ -0,0 +1,42 @@
+"""add comment counters
+
+Revision ID: c2e8b5f1a7d9
+Revises: a91d3f7c6e42
+Create Date: 2026-10-17 15:40:52.108364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e8b5f1a7d9'
+down_revision: Union[str, None] = 'a91d3f7c6e42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('comments', sa.Column('reply_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('articles', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+
+    # 根据现有评论回填计数（与CRUDComment.repair_counters一致）
+    op.execute(
+        "UPDATE comments c "
+        "LEFT JOIN (SELECT parent_id, COUNT(*) AS n FROM comments "
+        "WHERE parent_id IS NOT NULL GROUP BY parent_id) r ON r.parent_id = c.id "
+        "SET c.reply_count = COALESCE(r.n, 0)"
+    )
+    op.execute(
+        "UPDATE articles a "
+        "LEFT JOIN (SELECT article_id, COUNT(*) AS n FROM comments GROUP BY article_id) c "
+        "ON c.article_id = a.id "
+        "SET a.comment_count = COALESCE(c.n, 0)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('articles', 'comment_count')
+    op.drop_column('comments', 'reply_count')
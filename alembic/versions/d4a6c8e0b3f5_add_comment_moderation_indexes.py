@@ -0,0 +1,35 @@
+"""add comment moderation indexes
+
+Revision ID: d4a6c8e0b3f5
+Revises: c2e8b5f1a7d9
+Create Date: 2026-10-17 18:10:37.415206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a6c8e0b3f5'
+down_revision: Union[str, None] = 'c2e8b5f1a7d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_comments_status_created', 'comments', ['status', 'created_at', 'id'], unique=False
+    )
+    op.create_index('ix_comments_created_at_id', 'comments', ['created_at', 'id'], unique=False)
+    op.create_index(
+        'ft_comments_content', 'comments', ['content'],
+        unique=False, mysql_prefix='FULLTEXT', mysql_with_parser='ngram'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ft_comments_content', table_name='comments')
+    op.drop_index('ix_comments_created_at_id', table_name='comments')
+    op.drop_index('ix_comments_status_created', table_name='comments')
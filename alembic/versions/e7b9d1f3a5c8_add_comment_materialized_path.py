@@ -0,0 +1,42 @@
+"""add comment materialized path
+
+Revision ID: e7b9d1f3a5c8
+Revises: d4a6c8e0b3f5
+Create Date: 2026-10-17 18:42:05.861930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b9d1f3a5c8'
+down_revision: Union[str, None] = 'd4a6c8e0b3f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('comments', sa.Column('path', sa.String(length=255), server_default='', nullable=False))
+    op.add_column('comments', sa.Column('depth', sa.Integer(), server_default='0', nullable=False))
+
+    # 根据parent_id回填路径（与CRUDComment.rebuild_paths一致）
+    op.execute(
+        "WITH RECURSIVE tree (id, path, depth) AS ("
+        "SELECT id, CAST(CONCAT(LPAD(id, 10, '0'), '/') AS CHAR(255)), 0 "
+        "FROM comments WHERE parent_id IS NULL "
+        "UNION ALL "
+        "SELECT c.id, CONCAT(t.path, LPAD(c.id, 10, '0'), '/'), t.depth + 1 "
+        "FROM comments c JOIN tree t ON c.parent_id = t.id) "
+        "UPDATE comments c JOIN tree t ON t.id = c.id "
+        "SET c.path = t.path, c.depth = t.depth"
+    )
+    op.create_index('ix_comments_article_path', 'comments', ['article_id', 'path'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comments_article_path', table_name='comments')
+    op.drop_column('comments', 'depth')
+    op.drop_column('comments', 'path')
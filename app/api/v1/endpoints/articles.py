@@ -2,9 +2,15 @@ from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.deps import get_db, get_current_active_user, get_current_admin_user
+from app.core.view_counter import view_counter
+from app.core.pagination import parse_cursor, next_cursor, split_page
 # from app.core.response import ResponseSchema
-from app.schemas.article import ArticleCreate, ArticleUpdate, ArticleQueryParams, Article as ArticleSchema
+from app.schemas.article import (
+    ArticleCreate, ArticleUpdate, ArticleQueryParams, ArticleSummary, ArticleBatch, TagCount,
+    Article as ArticleSchema
+)
 from app.crud import crud_article
 from app.models.user import User
 from app.schemas.response import ResponseSchema
@@ -41,18 +47,88 @@ def read_articles(
 ) -> Any:
     """
     获取文章列表，支持分页和筛选
+
+    - 传入after（上一页返回的next_cursor）时按游标分页，忽略page
+    - 搜索结果按相关度排序，只支持page分页
+    - total_mode控制总数统计策略，为none时total返回null，通过has_more判断是否还有下一页
+    - view为summary时只返回摘要字段，不查询正文；excerpt_length指定正文摘录长度
     """
-    articles = crud_article.article.get_multi_by_params(db=db, params=params)
-    total = crud_article.article.get_total_count(db=db, params=params)
+    if params.after and params.search:
+        raise HTTPException(status_code=400, detail="搜索结果不支持游标分页")
+    after = parse_cursor(params.after)
+    if params.view == "summary":
+        get_rows, item_schema = crud_article.article.get_summaries_by_params, ArticleSummary
+    else:
+        get_rows, item_schema = crud_article.article.get_multi_by_params, ArticleSchema
+    # 多取一条用于判断是否还有下一页
+    rows = get_rows(db=db, params=params, after=after, limit=params.per_page + 1)
+    articles, has_more = split_page(rows, params.per_page)
+    total = crud_article.article.get_total_count(db=db, params=params, mode=params.total_mode)
     
-    # 使用 Pydantic 模型序列化文章列表
-    articles_data = [ArticleSchema.model_validate(article) for article in articles]
+    # 使用 Pydantic 模型序列化文章列表，浏览量合并尚未落库的增量
+    articles_data = [item_schema.model_validate(article) for article in articles]
+    pending_views = view_counter.pending_many(article.id for article in articles_data)
+    for article_data in articles_data:
+        article_data.views += pending_views.get(article_data.id, 0)
     
     return ResponseSchema(data={
         "total": total,
         "items": articles_data,
         "page": params.page,
-        "per_page": params.per_page
+        "per_page": params.per_page,
+        "has_more": has_more,
+        "next_cursor": None if params.search else next_cursor(articles, has_more)
+    })
+
+@router.get("/tags", response_model=ResponseSchema[List[TagCount]], summary="获取标签统计")
+def read_tag_counts(
+    db: Session = Depends(get_db),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    获取标签及对应的已发布文章数（标签云），按文章数倒序
+    """
+    tags = crud_article.article.get_tag_counts(db=db, limit=limit)
+    return ResponseSchema(data=tags)
+
+@router.get("/batch", response_model=ResponseSchema[ArticleBatch], summary="批量获取文章")
+def read_articles_batch(
+    db: Session = Depends(get_db),
+    ids: str = Query(..., description="逗号分隔的文章ID，如 1,2,3"),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    批量获取文章详情，供首页、推荐位等一次渲染多篇文章的场景使用
+
+    - 结果按请求中的ID顺序返回，重复ID只返回一次
+    - 不存在的文章ID在missing中返回
+    - 批量获取不计入浏览量
+    """
+    try:
+        article_ids = list(dict.fromkeys(int(i) for i in ids.split(",") if i.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="无效的文章ID")
+    if not article_ids:
+        raise HTTPException(status_code=400, detail="文章ID不能为空")
+    if len(article_ids) > settings.ARTICLE_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多获取 {settings.ARTICLE_BATCH_MAX_IDS} 篇文章"
+        )
+
+    articles = crud_article.article.get_details(db=db, ids=article_ids)
+    pending_views = view_counter.pending_many(articles)
+    items = []
+    for article_id in article_ids:
+        article_data = articles.get(article_id)
+        if article_data is not None:
+            article_data["views"] += pending_views.get(article_id, 0)
+            items.append(article_data)
+
+    return ResponseSchema(data={
+        "items": items,
+        "missing": [i for i in article_ids if i not in articles]
     })
 
 @router.get("/{article_id}", response_model=ResponseSchema[ArticleSchema], summary="获取文章详情")
@@ -63,14 +139,14 @@ def read_article(
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
-    通过ID获取文章详情
+    通过ID获取文章详情，优先读取详情缓存
     """
-    article = crud_article.article.get(db=db, id=article_id)
-    if not article:
+    article_data = crud_article.article.get_detail(db=db, id=article_id)
+    if article_data is None:
         raise HTTPException(status_code=404, detail="文章不存在")
-    # 增加浏览量
-    article = crud_article.article.increment_views(db=db, article_id=article_id)
-    return ResponseSchema(data=article)
+    # 增加浏览量：写入缓冲，由后台任务批量落库，返回值为已落库浏览量加未落库增量
+    article_data["views"] += view_counter.incr(article_id)
+    return ResponseSchema(data=article_data)
 
 @router.put("/{article_id}", response_model=ResponseSchema[ArticleSchema], summary="更新文章")
 def update_article(
@@ -1,45 +1,56 @@
 from datetime import timedelta
-from typing import Any
+from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.core import security
 from app.core.config import settings
-from app.core.deps import get_db
+from app.core.deps import get_db, get_current_active_user, oauth2_scheme
+from app.core.logger import logger
+from app.core.token_store import token_store
 from app.crud import crud_user
+from app.models.user import User as UserModel
 from app.schemas.user import User, UserCreate, Token
 from app.schemas.response import ResponseSchema
 
 router = APIRouter()
 
 @router.post("/register", response_model=ResponseSchema[User], summary="用户注册")
-def register(
+async def register(
     *,
     db: Session = Depends(get_db),
     user_in: UserCreate,
 ) -> Any:
     """
     用户注册接口
+
+    - 密码哈希在独立的线程池中计算，繁忙时返回503
     """
-    user = crud_user.user.get_by_email(db, email=user_in.email)
+    user = await run_in_threadpool(crud_user.user.get_by_email, db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=400,
             detail="该邮箱已被注册",
         )
-    user = crud_user.user.create(db, obj_in=user_in)
+    hashed_password = await security.get_password_hash_async(user_in.password)
+    user = await run_in_threadpool(
+        crud_user.user.create, db, obj_in=user_in, hashed_password=hashed_password
+    )
     return ResponseSchema(data=user)
 
 @router.post("/login", response_model=Token, summary="用户登录")
-def login(
+async def login(
     db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
 ) -> Any:
     """
     用户登录接口，获取access token
+
+    - 密码校验在独立的线程池中计算，繁忙时返回503
     """
-    user = crud_user.user.authenticate(
+    user = await crud_user.user.authenticate_async(
         db, email=form_data.username, password=form_data.password
     )
     if not user:
@@ -54,17 +65,8 @@ def login(
             detail="用户未激活",
         )
 
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        {"sub": user.email}, expires_delta=access_token_expires
-    )
-    refresh_token = security.create_refresh_token({"sub": user.email})
-    
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "refresh_token": refresh_token
-    }
+    # 每次登录创建新的refresh token家族
+    return _issue_tokens(user.email, family=security.new_token_id())
 
 @router.post("/refresh", response_model=ResponseSchema[Token], summary="刷新Token")
 def refresh_token(
@@ -73,28 +75,31 @@ def refresh_token(
 ) -> Any:
     """
     使用refresh token获取新的access token
+
+    - refresh token只能使用一次，刷新后旧refresh token失效（轮换）
+    - 已轮换的refresh token再次使用视为泄露，该登录会话签发的所有token都会被吊销
     """
     if not refresh_token:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="refresh token不能为空",
         )
+    invalid_token_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="无效的refresh token",
+    )
         
     try:
-        payload = security.jwt.decode(
-            refresh_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="无效的refresh token",
-            )
+        payload = security.token_verifier.decode(refresh_token)
     except security.JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="无效的refresh token",
-        )
+        raise invalid_token_exception
+    email: str = payload.get("sub")
+    jti: str = payload.get("jti")
+    family: str = payload.get("fam")
+    if email is None or jti is None or family is None or payload.get("type") != "refresh":
+        raise invalid_token_exception
+    if token_store.is_revoked(jti, family):
+        raise invalid_token_exception
 
     user = crud_user.user.get_by_email(db, email=email)
     if not user:
@@ -108,14 +113,63 @@ def refresh_token(
             detail="用户未激活",
         )
 
+    new_jti = security.new_token_id()
+    try:
+        rotated = token_store.rotate(family, jti, new_jti)
+    except Exception as e:
+        logger.error(f"Error rotating refresh token: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="服务繁忙，请稍后重试",
+        )
+    if not rotated:
+        raise invalid_token_exception
+    
+    return ResponseSchema(data=_issue_tokens(user.email, family=family, refresh_jti=new_jti, rotated=True))
+
+@router.post("/logout", response_model=ResponseSchema, summary="退出登录")
+def logout(
+    token: str = Depends(oauth2_scheme),
+    current_user: UserModel = Depends(get_current_active_user),
+) -> Any:
+    """
+    退出登录：吊销当前access token及同一登录会话的refresh token
+    """
+    payload = security.token_verifier.decode(token)
+    try:
+        # 一次写入同时吊销access token和整个家族，保留时间按refresh token有效期
+        token_store.revoke([payload.get("jti"), payload.get("fam")])
+    except Exception as e:
+        logger.error(f"Error revoking tokens on logout: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="服务繁忙，请稍后重试",
+        )
+    return ResponseSchema(data=None)
+
+def _issue_tokens(email: str, *, family: str, refresh_jti: Optional[str] = None, rotated: bool = False) -> dict:
+    """
+    签发access token和refresh token，两者属于同一refresh token家族
+    """
+    refresh_jti = refresh_jti or security.new_token_id()
+    if not rotated:
+        try:
+            token_store.start_family(family, refresh_jti)
+        except Exception as e:
+            logger.error(f"Error creating refresh token family: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="服务繁忙，请稍后重试",
+            )
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
-        {"sub": user.email}, expires_delta=access_token_expires
+        {"sub": email, "fam": family}, expires_delta=access_token_expires
     )
-    new_refresh_token = security.create_refresh_token({"sub": user.email})
+    refresh_token = security.create_refresh_token({"sub": email, "jti": refresh_jti, "fam": family})
     
-    return ResponseSchema(data={
+    return {
         "access_token": access_token,
         "token_type": "bearer",
-        "refresh_token": new_refresh_token
-    })
+        "refresh_token": refresh_token
+    }
@@ -1,14 +1,22 @@
+import asyncio
+import json
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.comment_stream import comment_stream
+from app.core.config import settings
 from app.core.deps import get_db, get_current_active_user, get_current_admin_user
+from app.core.pagination import parse_cursor, next_cursor, split_page
 from app.crud import crud_comment, crud_article
 from app.models.user import User
 from app.schemas.comment import (
     Comment as CommentSchema,
     CommentCreate,
     CommentQueryParams,
+    CommentBulkReview,
+    CommentBulkReviewResult,
 )
 from app.schemas.response import ResponseSchema
 
@@ -39,9 +47,12 @@ def create_comment(
             raise HTTPException(status_code=404, detail="父评论不存在")
         if parent_comment.article_id != comment_in.article_id:
             raise HTTPException(status_code=400, detail="父评论不属于该文章")
-        # 不允许嵌套回复（只允许二级评论）
-        if parent_comment.parent_id is not None:
-            raise HTTPException(status_code=400, detail="不支持嵌套回复")
+        # 限制嵌套层级
+        if parent_comment.depth + 1 >= settings.COMMENT_MAX_DEPTH:
+            raise HTTPException(
+                status_code=400,
+                detail=f"回复层级不能超过 {settings.COMMENT_MAX_DEPTH} 层"
+            )
     
     comment = crud_comment.comment.create_with_user(
         db=db, obj_in=comment_in, user_id=current_user.id
@@ -61,10 +72,13 @@ def read_article_comments(
     
     - parent_id为None时获取顶层评论
     - parent_id不为None时获取指定评论的回复
+    - 传入after（上一页返回的next_cursor）时按游标分页，忽略page
+    - 分页结果按文章缓存，评论新增、审核、删除时失效
     """
-    # 检查文章是否存在
-    article = crud_article.article.get(db=db, id=article_id)
-    if not article:
+    after = parse_cursor(params.after)
+    # 检查文章是否存在（读取文章详情缓存）
+    article = crud_article.article.get_detail(db=db, id=article_id)
+    if article is None:
         raise HTTPException(
             status_code=404,
             detail=f"文章 {article_id} 不存在"
@@ -78,44 +92,124 @@ def read_article_comments(
         if parent_comment.article_id != article_id:
             raise HTTPException(status_code=400, detail="父评论不属于该文章")
     
+    cache_key = crud_comment.comment.page_cache_key(
+        article_id=article_id,
+        params=params.model_dump(include={"parent_id", "page", "per_page", "after", "total_mode"})
+    )
+    page_data = crud_comment.comment.get_cached_page(key=cache_key)
+    if page_data is not None:
+        return ResponseSchema(data=page_data)
+    
     skip = (params.page - 1) * params.per_page
-    comments = crud_comment.comment.get_multi_by_article(
+    # 多取一条用于判断是否还有下一页
+    rows = crud_comment.comment.get_multi_by_article(
         db=db,
         article_id=article_id,
         skip=skip,
-        limit=params.per_page,
-        parent_id=params.parent_id
+        limit=params.per_page + 1,
+        parent_id=params.parent_id,
+        after=after
     )
+    comments, has_more = split_page(rows, params.per_page)
     total = crud_comment.comment.get_total_count_by_article(
         db=db,
         article_id=article_id,
-        parent_id=params.parent_id
+        parent_id=params.parent_id,
+        mode=params.total_mode
     )
     
-    # 获取每个评论的回复数和最新回复
-    comments_data = []
-    for comment in comments:
-        comment_data = CommentSchema.model_validate(comment)
-        if params.parent_id is None:  # 只为顶层评论获取回复信息
-            # 获取最新的5条回复
-            comment_with_replies = crud_comment.comment.get_with_replies(
-                db=db, comment_id=comment.id, reply_limit=5
-            )
-            if comment_with_replies:
-                comment_data.replies = [
-                    CommentSchema.model_validate(reply)
-                    for reply in comment_with_replies.replies
-                ]
-                comment_data.reply_count = crud_comment.comment.get_reply_count(
-                    db=db, comment_id=comment.id
-                )
-        comments_data.append(comment_data)
+    # 批量获取顶层评论的最新回复，查询次数与评论数量无关；回复数直接读取评论的回复计数
+    comments_data = [CommentSchema.model_validate(comment) for comment in comments]
+    if params.parent_id is None and comments:
+        replies = crud_comment.comment.get_latest_replies(
+            db=db, parent_ids=[comment.id for comment in comments], limit=5
+        )
+        for comment_data in comments_data:
+            comment_data.replies = [
+                CommentSchema.model_validate(reply)
+                for reply in replies.get(comment_data.id, [])
+            ]
     
-    return ResponseSchema(data={
+    page_data = {
         "total": total,
-        "items": comments_data,
+        "items": [comment_data.model_dump(mode="json") for comment_data in comments_data],
         "page": params.page,
-        "per_page": params.per_page
+        "per_page": params.per_page,
+        "has_more": has_more,
+        "next_cursor": next_cursor(comments, has_more)
+    }
+    crud_comment.comment.cache_page(article_id=article_id, key=cache_key, data=page_data)
+    return ResponseSchema(data=page_data)
+
+@router.get("/article/{article_id}/stream", summary="订阅文章新评论")
+async def stream_article_comments(
+    *,
+    request: Request,
+    db: Session = Depends(get_db),
+    article_id: int,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    以SSE（text/event-stream）推送指定文章新创建（created）和审核通过（approved）的评论
+
+    - 事件数据为评论JSON，与评论列表中的单条评论一致
+    - 定期发送心跳注释行保持连接
+    """
+    article = await asyncio.to_thread(crud_article.article.get_detail, db=db, id=article_id)
+    if article is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"文章 {article_id} 不存在"
+        )
+    # 长连接期间不占用数据库连接池
+    db.close()
+
+    async def event_stream():
+        async with comment_stream.subscribe(article_id) as queue:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=settings.COMMENT_STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {message['event']}\ndata: {json.dumps(message['data'], ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/{comment_id}/thread", response_model=ResponseSchema[dict], summary="获取评论讨论串")
+def read_comment_thread(
+    *,
+    db: Session = Depends(get_db),
+    comment_id: int,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    获取评论及其所有后代回复组成的讨论串
+
+    - 一次范围查询取出整棵子树，按层级嵌套在replies中返回
+    - total为讨论串中的评论总数（含该评论本身）
+    """
+    comments = crud_comment.comment.get_thread(db=db, id=comment_id)
+    if not comments:
+        raise HTTPException(status_code=404, detail="评论不存在")
+
+    # 结果按路径排序，父评论总在其回复之前
+    nodes = {}
+    for comment in comments:
+        node = CommentSchema.model_validate(comment)
+        nodes[node.id] = node
+        parent = nodes.get(node.parent_id)
+        if parent is not None:
+            parent.replies.append(node)
+
+    return ResponseSchema(data={
+        "total": len(comments),
+        "item": nodes[comment_id]
     })
 
 @router.get("", response_model=ResponseSchema[dict], summary="管理员获取所有评论")
@@ -127,26 +221,75 @@ def read_comments(
 ) -> Any:
     """
     管理员获取所有评论列表
+
+    - 传入after（上一页返回的next_cursor）时按游标分页，忽略page
     """
+    after = parse_cursor(params.after)
     skip = (params.page - 1) * params.per_page
-    comments = crud_comment.comment.get_multi(
+    # 多取一条用于判断是否还有下一页
+    rows = crud_comment.comment.get_multi(
         db=db,
         skip=skip,
-        limit=params.per_page,
+        limit=params.per_page + 1,
         status=params.status,
-        content=params.content
+        content=params.content,
+        after=after
     )
+    comments, has_more = split_page(rows, params.per_page)
     total = crud_comment.comment.get_total_count(
         db=db,
         status=params.status,
-        content=params.content
+        content=params.content,
+        mode=params.total_mode
     )
     
     return ResponseSchema(data={
         "total": total,
         "items": [CommentSchema.model_validate(comment) for comment in comments],
         "page": params.page,
-        "per_page": params.per_page
+        "per_page": params.per_page,
+        "has_more": has_more,
+        "next_cursor": next_cursor(comments, has_more)
+    })
+
+@router.post("/review/bulk", response_model=ResponseSchema[CommentBulkReviewResult], summary="批量审核评论")
+def bulk_review_comments(
+    *,
+    db: Session = Depends(get_db),
+    review_in: CommentBulkReview,
+    current_user: User = Depends(get_current_admin_user),
+) -> Any:
+    """
+    批量审核评论
+
+    - 只有管理员可以审核评论
+    - 通过ids指定评论，或通过filter（status/content/article_id）筛选评论，二者必须且只能提供一个
+    - 单次最多处理的评论数量由COMMENT_BULK_REVIEW_MAX限制
+    - 返回每条评论的处理结果：updated（已更新）、unchanged（状态未变）、not_found（不存在）
+    """
+    filters = review_in.filter.model_dump(exclude_none=True) if review_in.filter else None
+    if (review_in.ids is None) == (filters is None):
+        raise HTTPException(status_code=400, detail="ids和filter必须且只能提供一个")
+    if review_in.ids is not None and not review_in.ids:
+        raise HTTPException(status_code=400, detail="ids不能为空")
+    if filters is not None and not filters:
+        raise HTTPException(status_code=400, detail="filter至少需要一个条件")
+    if review_in.ids is not None and len(review_in.ids) > settings.COMMENT_BULK_REVIEW_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多审核 {settings.COMMENT_BULK_REVIEW_MAX} 条评论"
+        )
+
+    results = crud_comment.comment.bulk_review(
+        db=db,
+        status=review_in.status,
+        ids=review_in.ids,
+        filters=filters,
+        max_count=settings.COMMENT_BULK_REVIEW_MAX
+    )
+    return ResponseSchema(data={
+        "updated": sum(1 for result in results.values() if result == "updated"),
+        "results": [{"id": comment_id, "result": result} for comment_id, result in results.items()]
     })
 
 @router.post("/{comment_id}/review", response_model=ResponseSchema[CommentSchema], summary="审核评论")
@@ -170,11 +313,15 @@ def review_comment(
     if not comment:
         raise HTTPException(status_code=404, detail="评论不存在")
     
+    previous_status = comment.status
     comment = crud_comment.comment.update(
         db=db,
         db_obj=comment,
         obj_in={"status": status}
     )
+    # 审核通过的评论推送给正在订阅该文章的客户端
+    if status == "approved" and previous_status != "approved":
+        crud_comment.comment.publish_event("approved", comment)
     return ResponseSchema(data=CommentSchema.model_validate(comment))
 
 @router.delete("/article/{article_id}/comment/{comment_id}", response_model=ResponseSchema[CommentSchema], summary="删除评论")
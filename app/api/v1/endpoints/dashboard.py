@@ -23,7 +23,8 @@ def get_statistics(
     """
     # 基础统计数据
     article_count = db.query(func.count(Article.id)).scalar()
-    comment_count = db.query(func.count(Comment.id)).scalar()
+    # 评论总数由各文章的评论计数汇总，不扫描评论表
+    comment_count = db.query(func.coalesce(func.sum(Article.comment_count), 0)).scalar()
     user_count = db.query(func.count(User.id)).scalar()
 
     # 获取最近7天的日期列表
@@ -1,7 +1,9 @@
-from typing import Any, List
+from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
+from app.core import security
 from app.core.deps import get_db, get_current_active_user, get_current_admin_user
 from app.crud import crud_user
 from app.models.user import User
@@ -21,7 +23,7 @@ def read_user_me(
     return ResponseSchema(data=current_user)
 
 @router.put("/me", response_model=ResponseSchema[UserSchema], summary="更新当前用户信息")
-def update_user_me(
+async def update_user_me(
     *,
     db: Session = Depends(get_db),
     user_in: UserUpdate,
@@ -29,8 +31,15 @@ def update_user_me(
 ) -> Any:
     """
     更新当前登录用户信息
+
+    - 修改密码时密码哈希在独立的线程池中计算，繁忙时返回503
     """
-    user = crud_user.user.update(db, db_obj=current_user, obj_in=user_in)
+    hashed_password = None
+    if user_in.password:
+        hashed_password = await security.get_password_hash_async(user_in.password)
+    user = await run_in_threadpool(
+        crud_user.user.update, db, db_obj=current_user, obj_in=user_in, hashed_password=hashed_password
+    )
     return ResponseSchema(data=user)
 
 @router.get("", response_model=ResponseSchema[List[UserSchema]], summary="获取用户列表")
@@ -38,12 +47,15 @@ def read_users(
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after_id: Optional[int] = None,
     current_user: User = Depends(get_current_admin_user),
 ) -> Any:
     """
     获取用户列表（仅管理员）
+
+    - 传入after_id（上一页最后一个用户的id）时按id游标分页，忽略skip
     """
-    users = crud_user.user.get_multi(db, skip=skip, limit=limit)
+    users = crud_user.user.get_multi(db, skip=skip, limit=limit, after_id=after_id)
     return ResponseSchema(data=users)
 
 @router.get("/{user_id}", response_model=ResponseSchema[UserSchema], summary="获取指定用户信息")
@@ -1,42 +1,86 @@
-from typing import Any
-from fastapi import APIRouter, Depends, Request
+from datetime import date, timedelta
+from typing import Any, Optional
+from urllib.parse import urlsplit
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.deps import get_db, get_current_admin_user
+from app.core.visit_tracking import is_bot, is_reportable_path
+from app.core.visit_writer import visit_writer
 from app.crud import crud_visit
-from app.schemas.visit import VisitCreate, Visit, VisitStats
+from app.schemas.visit import VisitRecord, VisitStats
 from app.schemas.response import ResponseSchema
 from app.models.user import User
 
 router = APIRouter()
 
-@router.post("", response_model=ResponseSchema[Visit], summary="记录访问")
-def create_visit(
+@router.post("", response_model=ResponseSchema, status_code=202, summary="记录访问")
+async def create_visit(
     *,
-    db: Session = Depends(get_db),
     request: Request,
+    visit_in: Optional[VisitRecord] = Body(None),
 ) -> Any:
     """
     记录访问信息
+
+    - 用于客户端上报页面访问，访问路径取请求体中的path，未提供时取Referer中的路径
+    - 只接受匹配VISIT_REPORT_PATTERNS的前端路由，避免任意路径撑大汇总表和独立访客计数；
+      中间件已自动记录的路由（VISIT_TRACK_PATTERNS）不接受上报，避免重复计数
+    - 访问记录进入队列后立即返回202，由后台任务补充地理位置并批量写入
+    - 爬虫请求直接返回202但不记录
+    - 队列已满时返回503
     """
     client_host = request.client.host if request.client else "Unknown"
-    user_agent = request.headers.get("user-agent", "Unknown")
-    path = str(request.url.path)
+    user_agent = request.headers.get("user-agent")
+    path = visit_in.path if visit_in and visit_in.path else None
+    if path is None and request.headers.get("referer"):
+        path = urlsplit(request.headers["referer"]).path or "/"
+    if not path:
+        raise HTTPException(status_code=400, detail="缺少访问路径")
+    if not is_reportable_path(path):
+        raise HTTPException(status_code=400, detail="不记录该路径的访问")
+    if is_bot(user_agent):
+        return ResponseSchema(message="Accepted")
 
-    visit_in = VisitCreate(
-        ip=client_host,
-        user_agent=user_agent,
-        path=path
-    )
-    visit = crud_visit.visit.create_with_location(db=db, obj_in=visit_in)
-    return ResponseSchema(data=visit)
+    if not visit_writer.submit(ip=client_host, user_agent=user_agent, path=path):
+        raise HTTPException(
+            status_code=503,
+            detail="服务繁忙，请稍后重试",
+            headers={"Retry-After": "1"},
+        )
+    return ResponseSchema(message="Accepted")
 
 @router.get("/stats", response_model=ResponseSchema[VisitStats], summary="获取访问统计")
 def get_visit_stats(
     db: Session = Depends(get_db),
+    start_date: Optional[date] = Query(None, description="开始日期，默认为结束日期前6天"),
+    end_date: Optional[date] = Query(None, description="结束日期（包含），默认为今天"),
+    granularity: str = Query("day", pattern="^(day|hour)$", description="访问趋势粒度"),
+    path: Optional[str] = Query(None, description="只统计该路径的独立访客数"),
+    article_id: Optional[int] = Query(None, description="只统计该文章的独立访客数"),
     current_user: User = Depends(get_current_admin_user),
 ) -> Any:
     """
     获取访问统计信息（仅管理员）
+
+    - 统计日期范围内的总访问量、按地理位置和路径的访问量及访问趋势
+    - 数据来自按小时/天的汇总表
+    - 独立访客数为HyperLogLog估算值，可按路径或文章限定范围，多天范围内同一访客只计一次
     """
-    stats = crud_visit.visit.get_visit_stats(db=db)
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=6)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="开始日期不能晚于结束日期")
+    if (end_date - start_date).days >= settings.VISIT_STATS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"统计范围不能超过{settings.VISIT_STATS_MAX_DAYS}天")
+    if path is not None and article_id is not None:
+        raise HTTPException(status_code=400, detail="path和article_id不能同时指定")
+    stats = crud_visit.visit.get_visit_stats(
+        db=db,
+        start_date=start_date,
+        end_date=end_date,
+        granularity=granularity,
+        path=path,
+        article_id=article_id
+    )
     return ResponseSchema(data=stats)
@@ -1,12 +1,60 @@
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 from redis import Redis
 from app.core.config import settings
 from app.core.logger import logger
 import json
+import hashlib
 import pickle
+import threading
+import time
+from collections import OrderedDict
 from datetime import timedelta
 from functools import wraps
 
+class TTLCache:
+    """进程内LRU缓存，条目超过ttl秒后失效，线程安全"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        """获取缓存值，不存在或已过期时返回None"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        """设置缓存值，超过maxsize时淘汰最久未使用的条目"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Any) -> None:
+        """删除缓存值"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
 class RedisCache:
     def __init__(self):
         self.redis_client = Redis(
@@ -39,6 +87,44 @@ class RedisCache:
             logger.error(f"Error getting cache key {key}: {str(e)}")
             return None
 
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """批量获取缓存值（MGET），按keys顺序返回，未命中为None"""
+        if not keys:
+            return []
+        try:
+            values = self.redis_client.mget(keys)
+        except Exception as e:
+            logger.error(f"Error getting cache keys {keys}: {str(e)}")
+            return [None] * len(keys)
+        result = []
+        for value in values:
+            if not value:
+                result.append(None)
+                continue
+            try:
+                result.append(json.loads(value))
+            except json.JSONDecodeError:
+                result.append(pickle.loads(value))
+        return result
+
+    def set_many(self, mapping: Dict[str, Any], expire: int = 3600) -> bool:
+        """批量设置缓存值，使用pipeline一次往返"""
+        if not mapping:
+            return True
+        try:
+            pipe = self.redis_client.pipeline()
+            for key, value in mapping.items():
+                if isinstance(value, (dict, list, str, int, float, bool)):
+                    value = json.dumps(value)
+                else:
+                    value = pickle.dumps(value)
+                pipe.set(key, value, ex=expire)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error setting cache keys {list(mapping)}: {str(e)}")
+            return False
+
     def set(self, key: str, value: Any, expire: int = 3600) -> bool:
         """设置缓存值"""
         try:
@@ -89,6 +175,55 @@ class RedisCache:
             logger.error(f"Error clearing cache: {str(e)}")
             return False
 
+    def get_version(self, namespace: str) -> int:
+        """获取命名空间的当前版本号"""
+        try:
+            return int(self.redis_client.get(f"{namespace}:version") or 0)
+        except Exception as e:
+            logger.error(f"Error getting cache version {namespace}: {str(e)}")
+            return 0
+
+    def bump_version(self, namespace: str) -> int:
+        """递增命名空间版本号，使该命名空间下的所有版本化缓存整体失效"""
+        try:
+            return int(self.redis_client.incr(f"{namespace}:version"))
+        except Exception as e:
+            logger.error(f"Error bumping cache version {namespace}: {str(e)}")
+            return 0
+
+    def versioned_key(self, namespace: str, name: str, params: Optional[dict] = None) -> str:
+        """生成带命名空间版本号的缓存键，params按内容摘要后拼入键中"""
+        key = f"{namespace}:v{self.get_version(namespace)}:{name}"
+        if params:
+            digest = hashlib.md5(
+                json.dumps(params, sort_keys=True, default=str).encode()
+            ).hexdigest()
+            key += f":{digest}"
+        return key
+
+    def set_tracked(self, namespace: str, key: str, value: Any, expire: int = 3600) -> bool:
+        """设置缓存值，并把键记录到命名空间的键集合中，便于精确删除"""
+        if not self.set(key, value, expire):
+            return False
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.sadd(f"{namespace}:keys", key)
+            pipe.expire(f"{namespace}:keys", expire)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error tracking cache key {key}: {str(e)}")
+            return False
+
+    def delete_tracked(self, namespace: str) -> bool:
+        """删除命名空间键集合中记录的所有缓存"""
+        try:
+            keys = self.redis_client.smembers(f"{namespace}:keys")
+            return bool(self.redis_client.delete(f"{namespace}:keys", *keys))
+        except Exception as e:
+            logger.error(f"Error deleting tracked cache keys of {namespace}: {str(e)}")
+            return False
+
     def get_or_set(self, key: str, value_func, expire: int = 3600) -> Any:
         """获取缓存，如果不存在则设置"""
         value = self.get(key)
@@ -0,0 +1,109 @@
+import asyncio
+import json
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+from redis.asyncio import Redis as AsyncRedis
+from app.core.cache import redis_cache
+from app.core.config import settings
+from app.core.logger import logger
+
+
+class CommentStream:
+    """
+    文章评论实时推送
+
+    评论写操作通过Redis发布到按文章划分的频道；每个worker进程只保持一条
+    PSUBSCRIBE连接，收到消息后分发给本进程内订阅该文章的SSE连接，
+    因此多worker部署时任意worker上的客户端都能收到推送。
+    """
+    CHANNEL_PREFIX = "comments:stream:"
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._task: Optional[asyncio.Task] = None
+
+    def channel(self, article_id: int) -> str:
+        """文章评论推送频道"""
+        return f"{self.CHANNEL_PREFIX}{article_id}"
+
+    def publish(self, article_id: int, event: str, data: Dict[str, Any]) -> None:
+        """发布评论事件，推送失败不影响评论写入"""
+        try:
+            redis_cache.redis_client.publish(
+                self.channel(article_id), json.dumps({"event": event, "data": data})
+            )
+        except Exception as e:
+            logger.warning(f"Failed to publish comment event for article {article_id}: {str(e)}")
+
+    @asynccontextmanager
+    async def subscribe(self, article_id: int) -> AsyncIterator[asyncio.Queue]:
+        """订阅文章评论事件，返回接收事件的队列"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.COMMENT_STREAM_QUEUE_SIZE)
+        self._subscribers[article_id].add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(article_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[article_id]
+
+    def _dispatch(self, channel: str, payload: str) -> None:
+        try:
+            article_id = int(channel[len(self.CHANNEL_PREFIX):])
+            message = json.loads(payload)
+        except (ValueError, TypeError):
+            return
+        for queue in list(self._subscribers.get(article_id, ())):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # 客户端消费过慢时丢弃事件，不阻塞其他连接
+                logger.warning(f"Comment stream subscriber for article {article_id} is lagging, event dropped")
+
+    async def _run(self):
+        while True:
+            client = AsyncRedis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                decode_responses=True,
+                password=settings.REDIS_PASSWORD
+            )
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{self.CHANNEL_PREFIX}*")
+                async for message in pubsub.listen():
+                    if message.get("type") == "pmessage":
+                        self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Comment stream subscription lost, reconnecting: {str(e)}")
+                await asyncio.sleep(settings.COMMENT_STREAM_RECONNECT_DELAY)
+            finally:
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except Exception:
+                    pass
+
+    def start(self):
+        """启动Redis订阅任务"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止Redis订阅任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# 创建全局评论推送实例
+comment_stream = CommentStream()
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 import json
 
@@ -25,16 +25,56 @@ class Settings(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_MINUTES: int
+    JWT_BACKEND: str = "jose"  # JWT实现：jose（python-jose）或pyjwt（需要安装PyJWT）
+    JWT_PRIVATE_KEY: Optional[str] = None  # 非对称算法（RS*/ES*）的签名私钥（PEM）
+    JWT_PUBLIC_KEY: Optional[str] = None  # 非对称算法（RS*/ES*）的验签公钥（PEM）
+    TOKEN_CACHE_SIZE: int = 10000  # 已验证token的进程内缓存数量
+    TOKEN_REVOCATION_SYNC_INTERVAL: int = 5  # 本地吊销布隆过滤器从Redis增量同步的间隔（秒）
+    TOKEN_BLOOM_REBUILD_INTERVAL: int = 3600  # 本地吊销布隆过滤器全量重建的间隔（秒）
+    TOKEN_BLOOM_CAPACITY: int = 100000  # 布隆过滤器容量（吊销记录数）
+    TOKEN_BLOOM_ERROR_RATE: float = 0.001  # 布隆过滤器误报率
     
     # CORS设置
     CORS_ORIGINS: List[str]
     
+    # 密码哈希设置
+    PASSWORD_HASH_WORKERS: int = 4  # 密码哈希线程池大小，建议不超过CPU核数
+    PASSWORD_HASH_MAX_PENDING: int = 64  # 正在计算和排队的哈希任务上限，超过时返回503
+
     # Rate limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     
     # 缓存设置
     DEFAULT_CACHE_EXPIRE: int = 3600  # 默认缓存过期时间（秒）
+    COUNT_CACHE_EXPIRE: int = 300  # 列表总数缓存过期时间（秒）
+    ARTICLE_CACHE_EXPIRE: int = 300  # 文章详情缓存过期时间（秒）
+    COMMENT_PAGE_CACHE_EXPIRE: int = 60  # 文章评论分页缓存过期时间（秒）
+    VIEW_COUNT_FLUSH_INTERVAL: int = 10  # 浏览量增量批量写回数据库的间隔（秒）
+    PRINCIPAL_CACHE_EXPIRE: int = 300  # 认证用户快照的Redis缓存时间（秒）
+    PRINCIPAL_LOCAL_CACHE_TTL: int = 5  # 认证用户快照的进程内缓存时间（秒），其他进程修改用户后最多延迟该时间生效
+    PRINCIPAL_LOCAL_CACHE_SIZE: int = 10000  # 进程内最多缓存的认证用户数
+
+    # 评论实时推送设置
+    COMMENT_STREAM_HEARTBEAT: int = 15  # SSE心跳间隔（秒）
+    COMMENT_STREAM_QUEUE_SIZE: int = 100  # 每个SSE连接最多缓冲的事件数
+    COMMENT_STREAM_RECONNECT_DELAY: int = 5  # Redis订阅断开后的重连间隔（秒）
     
+    # GeoIP设置
+    GEOIP_DB_PATH: Optional[str] = None  # IP段数据库CSV文件路径（起始IP,结束IP,国家,城市）
+    GEOIP_CACHE_SIZE: int = 65536  # 最近查询IP的LRU缓存大小
+
+    # 访问记录写入设置
+    VISIT_QUEUE_SIZE: int = 10000  # 待写入访问记录队列上限，队列满时拒绝新的访问记录
+    VISIT_BATCH_SIZE: int = 500  # 每批最多写入的访问记录数
+    VISIT_FLUSH_INTERVAL: float = 1.0  # 凑批最长等待时间（秒）
+    VISIT_UV_RETENTION_DAYS: int = 90  # 独立访客HyperLogLog保留天数，统计范围超出时独立访客数只统计保留期内的部分
+    VISIT_STATS_MAX_DAYS: int = 366  # 访问统计单次查询的最大天数（访问量来自汇总表，不受上面的保留期限制）
+    VISIT_TRACK_ENABLED: bool = True  # 是否自动记录页面访问
+    VISIT_TRACK_PATTERNS: List[str] = []  # 自动记录访问的路径正则，为空时只记录文章详情页
+    VISIT_TRACK_SAMPLE_RATE: float = 1.0  # 自动记录访问的采样率（0~1）
+    VISIT_REPORT_PATTERNS: List[str] = [r"^/$"]  # 允许客户端通过POST /visits上报的前端路由正则（不含自动记录的路由）
+    VISIT_BOT_USER_AGENT_PATTERN: str = r"bot|crawl|spider|slurp|curl|wget|python-requests|httpx|headless"  # 不计入访问的User-Agent
+
     # 监控设置
     ENABLE_PERFORMANCE_MONITORING: bool = True
     MONITORING_INTERVAL: int = 60  # 性能数据收集间隔（秒）
@@ -59,6 +99,9 @@ class Settings(BaseSettings):
     
     # 其他设置
     ITEMS_PER_PAGE: int = 10
+    ARTICLE_BATCH_MAX_IDS: int = 100  # 批量获取文章时单次最多的ID数量
+    COMMENT_BULK_REVIEW_MAX: int = 10000  # 批量审核评论时单次最多处理的评论数量
+    COMMENT_MAX_DEPTH: int = 5  # 评论最大层级（顶层评论为第1层），受comments.path长度限制最多23层
 
     class Config:
         case_sensitive = True
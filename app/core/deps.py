@@ -1,11 +1,13 @@
 from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app.core.config import settings
 from app.core import security
+from app.core.token_store import token_store
+from app.crud import crud_user
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
@@ -27,16 +29,22 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        # 已验证过的token直接读取缓存的解码结果
+        payload = security.token_verifier.decode(token)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    # refresh token不能当作access token使用
+    if payload.get("type") == "refresh":
+        raise credentials_exception
+    # 已退出登录或所属会话已被吊销；未吊销时只查本地布隆过滤器，不访问Redis
+    if token_store.is_revoked(payload.get("jti"), payload.get("fam")):
+        raise credentials_exception
     
-    user = db.query(User).filter(User.email == email).first()
+    # 认证用户有缓存，稳态下不查询数据库
+    user = crud_user.user.get_principal(db, email=email)
     if user is None:
         raise credentials_exception
     return user
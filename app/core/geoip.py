@@ -0,0 +1,135 @@
+import csv
+import ipaddress
+import threading
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.logger import logger
+
+UNKNOWN_LOCATION = "Unknown"
+
+
+class _RangeTable:
+    """按起始地址排序的IP段表，起止地址和位置下标分列存储"""
+
+    def __init__(self, typecode: Optional[str]):
+        # IPv4地址可以放进定长整数数组；IPv6为128位整数，使用列表
+        self.starts = array(typecode) if typecode else []
+        self.ends = array(typecode) if typecode else []
+        self.locations = array("I")
+
+    def append(self, start: int, end: int, location: int) -> None:
+        self.starts.append(start)
+        self.ends.append(end)
+        self.locations.append(location)
+
+    def sort(self) -> None:
+        order = sorted(range(len(self.starts)), key=self.starts.__getitem__)
+        for name in ("starts", "ends", "locations"):
+            column = getattr(self, name)
+            sorted_column = [column[i] for i in order]
+            setattr(self, name, array(column.typecode, sorted_column) if isinstance(column, array) else sorted_column)
+
+    def find(self, address: int) -> Optional[int]:
+        i = bisect_right(self.starts, address) - 1
+        if i >= 0 and address <= self.ends[i]:
+            return self.locations[i]
+        return None
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+class GeoIPResolver:
+    """
+    离线IP地理位置解析
+
+    从CSV格式的IP段数据库加载（每行：起始IP,结束IP,国家,城市，IP可以是地址或整数，
+    多余的列忽略），IPv4和IPv6分别存为按起始地址排序的整数数组，查询时二分查找，
+    最近查询的IP另有LRU缓存。不发起任何网络请求。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        # (按IP版本划分的IP段表, 位置名称列表)，整体替换以便重新加载时查询不受影响
+        self._db: Optional[Tuple[Dict[int, _RangeTable], List[str]]] = None
+        self._load_lock = threading.Lock()
+        self._cached_lookup = lru_cache(maxsize=settings.GEOIP_CACHE_SIZE)(self._lookup)
+
+    @staticmethod
+    def _parse_address(value: str) -> Tuple[int, int]:
+        value = value.strip()
+        if value.isdigit():
+            address = ipaddress.ip_address(int(value))
+        else:
+            address = ipaddress.ip_address(value)
+        # 部分IPv6数据库把IPv4段存为IPv4映射地址（::ffff:a.b.c.d），统一放入IPv4表
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        return address.version, int(address)
+
+    def load(self, path: Optional[str] = None) -> None:
+        """加载（或重新加载）IP段数据库，数据库不存在时所有IP解析为Unknown"""
+        path = path or self.path
+        tables = {4: _RangeTable("L"), 6: _RangeTable(None)}
+        location_names: List[str] = []
+        location_index: Dict[str, int] = {}
+
+        if not path or not Path(path).is_file():
+            logger.warning(f"GeoIP database not found at {path!r}, all locations resolve to {UNKNOWN_LOCATION}")
+        else:
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.reader(f):
+                    if len(row) < 3 or row[0].startswith("#"):
+                        continue
+                    try:
+                        start_version, start = self._parse_address(row[0])
+                        end_version, end = self._parse_address(row[1])
+                    except ValueError:
+                        # 表头或无法解析的行
+                        continue
+                    if start_version != end_version:
+                        continue
+                    parts = [part.strip() for part in row[2:4] if part.strip() and part.strip() != "-"]
+                    name = ", ".join(parts) or UNKNOWN_LOCATION
+                    index = location_index.get(name)
+                    if index is None:
+                        index = location_index[name] = len(location_names)
+                        location_names.append(name)
+                    tables[start_version].append(start, end, index)
+            for table in tables.values():
+                table.sort()
+            logger.info(
+                f"Loaded GeoIP database {path}: {len(tables[4])} IPv4 ranges, "
+                f"{len(tables[6])} IPv6 ranges, {len(location_names)} locations"
+            )
+
+        self.path = path
+        self._db = (tables, location_names)
+        self._cached_lookup.cache_clear()
+
+    def _lookup(self, ip: str) -> str:
+        try:
+            address = ipaddress.ip_address(ip.strip())
+        except ValueError:
+            return UNKNOWN_LOCATION
+        # IPv4映射的IPv6地址（::ffff:a.b.c.d）按IPv4查询
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        tables, location_names = self._db
+        index = tables[address.version].find(int(address))
+        return location_names[index] if index is not None else UNKNOWN_LOCATION
+
+    def lookup(self, ip: str) -> str:
+        """解析IP的地理位置，返回"国家, 城市"，无法解析时返回Unknown"""
+        if self._db is None:
+            with self._load_lock:
+                if self._db is None:
+                    self.load()
+        return self._cached_lookup(ip)
+
+# 创建全局GeoIP解析实例
+geoip = GeoIPResolver(settings.GEOIP_DB_PATH)
@@ -0,0 +1,39 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+from fastapi import HTTPException
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """将(created_at, id)编码为不透明游标"""
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """解析游标，格式错误时抛出ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(id)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def split_page(rows: Sequence[Any], limit: int) -> Tuple[Sequence[Any], bool]:
+    """将多取一条的查询结果拆分为当前页数据和是否还有下一页"""
+    return rows[:limit], len(rows) > limit
+
+def next_cursor(items: Sequence[Any], has_more: bool) -> Optional[str]:
+    """根据当前页最后一条记录生成下一页游标，没有下一页时返回None"""
+    if not items or not has_more:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
+
+def parse_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """解析请求中的游标参数，格式错误时返回400"""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="无效的分页游标")
@@ -1,30 +1,183 @@
+import asyncio
+import hashlib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from typing import Any, Callable, Dict, Optional, TypeVar
+from fastapi import HTTPException, status
+from jose import JWTError, jwk, jwt
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
+# 密码哈希专用线程池：bcrypt计算时释放GIL，与AnyIO默认线程池隔离，登录高峰不会占满普通接口的线程
+_password_pool: Optional[ThreadPoolExecutor] = None
+_password_pool_lock = threading.Lock()
+# 准入控制：正在计算和排队的哈希任务总数上限
+_password_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def _get_password_pool() -> ThreadPoolExecutor:
+    global _password_pool
+    if _password_pool is None:
+        with _password_pool_lock:
+            if _password_pool is None:
+                _password_pool = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+                )
+    return _password_pool
+
+async def _run_in_password_pool(func: Callable[..., T], *args) -> T:
+    """
+    在密码哈希线程池中执行，排队任务已满时直接返回503，不继续堆积请求
+    """
+    if not _password_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="服务繁忙，请稍后重试",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        future = _get_password_pool().submit(func, *args)
+    except BaseException:
+        _password_slots.release()
+        raise
+    # 任务真正结束（完成或排队中被取消）时才释放名额：等待的协程被取消时，
+    # 线程池中的任务可能仍在排队或计算，提前释放会使排队任务数超过上限
+    future.add_done_callback(lambda _: _password_slots.release())
+    return await asyncio.wrap_future(future)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_password_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_in_password_pool(get_password_hash, password)
+
+def shutdown_password_pool() -> None:
+    """关闭密码哈希线程池"""
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is not None:
+            _password_pool.shutdown(wait=True, cancel_futures=True)
+            _password_pool = None
+
+class JoseBackend:
+    """python-jose实现，签名和验签密钥在初始化时解析为密钥对象"""
+
+    def __init__(self, algorithm: str, signing_key: str, verifying_key: str):
+        self.algorithm = algorithm
+        self._signing_key = jwk.construct(signing_key, algorithm)
+        self._verifying_key = jwk.construct(verifying_key, algorithm)
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        return jwt.encode(claims, self._signing_key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        return jwt.decode(token, self._verifying_key, algorithms=[self.algorithm])
+
+
+class PyJWTBackend:
+    """PyJWT实现（可选依赖，需要安装PyJWT），验签错误统一转换为JWTError"""
+
+    def __init__(self, algorithm: str, signing_key: str, verifying_key: str):
+        import jwt as pyjwt
+
+        self._pyjwt = pyjwt
+        self.algorithm = algorithm
+        algorithm_impl = pyjwt.get_algorithm_by_name(algorithm)
+        self._signing_key = algorithm_impl.prepare_key(signing_key)
+        self._verifying_key = algorithm_impl.prepare_key(verifying_key)
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        return self._pyjwt.encode(claims, self._signing_key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            return self._pyjwt.decode(token, self._verifying_key, algorithms=[self.algorithm])
+        except self._pyjwt.PyJWTError as e:
+            raise JWTError(str(e)) from e
+
+
+JWT_BACKENDS = {"jose": JoseBackend, "pyjwt": PyJWTBackend}
+
+
+class TokenVerifier:
+    """
+    JWT签发与验证
+
+    验证通过的token按其SHA-256摘要缓存解码结果直到exp，同一token再次请求时不重复验签；
+    HS*算法使用SECRET_KEY，RS*/ES*等非对称算法使用JWT_PRIVATE_KEY签名、JWT_PUBLIC_KEY验签
+    """
+
+    def __init__(self):
+        self._backend = None
+        self._cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            if settings.ALGORITHM.startswith("HS"):
+                signing_key = verifying_key = settings.SECRET_KEY
+            else:
+                signing_key, verifying_key = settings.JWT_PRIVATE_KEY, settings.JWT_PUBLIC_KEY
+            self._backend = JWT_BACKENDS[settings.JWT_BACKEND](settings.ALGORITHM, signing_key, verifying_key)
+        return self._backend
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        return self.backend.encode(claims)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """验证并解码token，失败时抛出JWTError"""
+        key = hashlib.sha256(token.encode()).digest()
+        payload = self._cache.get(key)
+        if payload is None:
+            payload = self.backend.decode(token)
+            expires_in = payload.get("exp", 0) - time.time()
+            if expires_in > 0:
+                self._cache.set(key, payload, ttl=expires_in)
+        elif payload.get("exp", 0) <= time.time():
+            raise JWTError("Signature has expired.")
+        return dict(payload)
+
+# 创建全局Token验证实例
+token_verifier = TokenVerifier()
+
+def new_token_id() -> str:
+    return uuid.uuid4().hex
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """
+    签发access token，data中可带fam（所属refresh token家族），家族被吊销时一并失效
+    """
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    to_encode.setdefault("jti", new_token_id())
+    to_encode.update({"exp": expire, "type": "access"})
+    encoded_jwt = token_verifier.encode(to_encode)
     return encoded_jwt
 
 def create_refresh_token(data: dict) -> str:
+    """
+    签发refresh token，data中需带jti和fam（刷新时轮换jti，fam保持不变）
+    """
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    to_encode.setdefault("jti", new_token_id())
+    to_encode.setdefault("fam", new_token_id())
+    to_encode.update({"exp": expire, "type": "refresh"})
+    encoded_jwt = token_verifier.encode(to_encode)
     return encoded_jwt
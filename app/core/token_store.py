@@ -0,0 +1,168 @@
+import hashlib
+import math
+import threading
+import time
+from typing import Iterable, Optional
+from app.core.cache import redis_cache
+from app.core.config import settings
+from app.core.logger import logger
+
+
+class BloomFilter:
+    """位数组实现的布隆过滤器，只会误报，不会漏报"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class TokenStore:
+    """
+    Token吊销与refresh token轮换存储
+
+    - 吊销的jti（单个token）和fam（refresh token家族，吊销后该家族签发的所有token失效）
+      写入Redis键 auth:revoked:{id}（过期时间为token剩余有效期），并记录到有序集合auth:revoked
+      （score为吊销时间）
+    - 每个进程在本地维护吊销ID的布隆过滤器，按间隔从有序集合增量同步；未命中布隆过滤器的
+      token（绝大多数请求）无需访问Redis，命中时再查Redis确认
+    - 每个refresh token家族在Redis中记录当前有效的jti，刷新时原子地比较并替换；
+      已轮换掉的旧refresh token再次使用即视为泄露，吊销整个家族
+    """
+    REVOKED_KEY = "auth:revoked"
+    FAMILY_KEY_PREFIX = "auth:family:"
+
+    # 比较并替换家族当前jti：1轮换成功，0旧token被重复使用，-1家族不存在（已过期或已注销）
+    ROTATE_SCRIPT = """
+    local current = redis.call('GET', KEYS[1])
+    if not current then return -1 end
+    if current ~= ARGV[1] then return 0 end
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom: Optional[BloomFilter] = None
+        self._built_at = 0.0
+        self._synced_at = 0.0
+        self._rotate = None
+
+    def revoked_key(self, token_id: str) -> str:
+        return f"{self.REVOKED_KEY}:{token_id}"
+
+    def family_key(self, family: str) -> str:
+        return f"{self.FAMILY_KEY_PREFIX}{family}"
+
+    @property
+    def max_lifetime(self) -> int:
+        """吊销记录最长需要保留的时间（秒），即refresh token的有效期"""
+        return settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60
+
+    def _rebuild(self, now: float) -> None:
+        client = redis_cache.redis_client
+        client.zremrangebyscore(self.REVOKED_KEY, "-inf", now - self.max_lifetime)
+        bloom = BloomFilter(settings.TOKEN_BLOOM_CAPACITY, settings.TOKEN_BLOOM_ERROR_RATE)
+        for token_id in client.zrange(self.REVOKED_KEY, 0, -1):
+            bloom.add(token_id)
+        self._bloom = bloom
+        self._built_at = now
+
+    def _sync(self) -> None:
+        """按间隔把其他进程新吊销的ID同步到本地布隆过滤器，定期全量重建以清除过期ID"""
+        now = time.time()
+        if now - self._synced_at < settings.TOKEN_REVOCATION_SYNC_INTERVAL:
+            return
+        with self._lock:
+            if now - self._synced_at < settings.TOKEN_REVOCATION_SYNC_INTERVAL:
+                return
+            if self._bloom is None or now - self._built_at > settings.TOKEN_BLOOM_REBUILD_INTERVAL:
+                self._rebuild(now)
+            else:
+                # 多取一段时间，容忍各进程间的时钟偏差
+                since = self._synced_at - settings.TOKEN_REVOCATION_SYNC_INTERVAL
+                for token_id in redis_cache.redis_client.zrangebyscore(self.REVOKED_KEY, since, "+inf"):
+                    self._bloom.add(token_id)
+            self._synced_at = now
+
+    def is_revoked(self, *token_ids: Optional[str]) -> bool:
+        """
+        检查jti或fam是否已被吊销
+
+        Redis不可用时，已确认的吊销记录（本地布隆过滤器命中）按已吊销处理
+        """
+        ids = [token_id for token_id in token_ids if token_id]
+        if not ids:
+            return False
+        try:
+            self._sync()
+        except Exception as e:
+            logger.warning(f"Failed to sync token revocations from Redis: {str(e)}")
+        if self._bloom is None:
+            candidates = ids
+        else:
+            candidates = [token_id for token_id in ids if token_id in self._bloom]
+        if not candidates:
+            return False
+        try:
+            return bool(redis_cache.redis_client.exists(*(self.revoked_key(i) for i in candidates)))
+        except Exception as e:
+            logger.error(f"Error checking token revocation: {str(e)}")
+            return self._bloom is not None
+
+    def revoke(self, token_ids: Iterable[Optional[str]], expires_in: Optional[int] = None) -> None:
+        """
+        吊销jti或fam，expires_in为token剩余有效期（秒），默认为refresh token有效期
+        """
+        ids = [token_id for token_id in token_ids if token_id]
+        if not ids:
+            return
+        ttl = max(1, int(expires_in or self.max_lifetime))
+        now = time.time()
+        pipe = redis_cache.redis_client.pipeline()
+        for token_id in ids:
+            pipe.set(self.revoked_key(token_id), 1, ex=ttl)
+            pipe.zadd(self.REVOKED_KEY, {token_id: now})
+            # 吊销家族时同时删除其当前refresh token记录，之后无法再轮换
+            pipe.delete(self.family_key(token_id))
+        pipe.execute()
+        with self._lock:
+            if self._bloom is not None:
+                for token_id in ids:
+                    self._bloom.add(token_id)
+
+    def start_family(self, family: str, jti: str) -> None:
+        """登录时创建refresh token家族，记录当前有效的refresh token"""
+        redis_cache.redis_client.set(self.family_key(family), jti, ex=self.max_lifetime)
+
+    def rotate(self, family: str, old_jti: str, new_jti: str) -> bool:
+        """
+        轮换refresh token：只有家族当前的refresh token可以换取新token
+
+        旧refresh token被重复使用时吊销整个家族并返回False
+        """
+        if self._rotate is None:
+            self._rotate = redis_cache.redis_client.register_script(self.ROTATE_SCRIPT)
+        result = self._rotate(keys=[self.family_key(family)], args=[old_jti, new_jti, self.max_lifetime])
+        if result == 1:
+            return True
+        if result == 0:
+            logger.warning(f"Refresh token reuse detected, revoking token family {family}")
+            self.revoke([family])
+        return False
+
+# 创建全局Token存储实例
+token_store = TokenStore()
@@ -0,0 +1,165 @@
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+from app.core.cache import redis_cache
+from app.core.config import settings
+from app.core.logger import logger
+from app.crud import crud_article
+from app.db.session import get_db_session
+
+
+class ViewCounter:
+    """
+    文章浏览量写回缓冲
+
+    浏览请求只在Redis哈希中累加增量，由后台任务按固定间隔把增量批量写回
+    articles.views，避免每次访问详情页都对文章行加锁。Redis不可用时退化为进程内缓冲。
+    """
+    PENDING_KEY = "article:views:pending"
+    FLUSHING_KEY = "article:views:flushing"
+    LOCK_KEY = "article:views:flush_lock"
+
+    def __init__(self):
+        self._local: Dict[int, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def incr(self, article_id: int) -> int:
+        """记录一次浏览，返回该文章尚未落库的浏览增量"""
+        try:
+            pipe = redis_cache.redis_client.pipeline()
+            pipe.hincrby(self.PENDING_KEY, article_id, 1)
+            pipe.hget(self.FLUSHING_KEY, article_id)
+            pending, flushing = pipe.execute()
+            return int(pending) + int(flushing or 0) + self._local.get(article_id, 0)
+        except Exception as e:
+            logger.warning(f"Failed to buffer view in Redis, using local buffer: {str(e)}")
+            with self._lock:
+                self._local[article_id] += 1
+                return self._local[article_id]
+
+    def pending_many(self, article_ids: Iterable[int]) -> Dict[int, int]:
+        """批量获取文章尚未落库的浏览增量"""
+        ids = list(article_ids)
+        if not ids:
+            return {}
+        result = {article_id: self._local.get(article_id, 0) for article_id in ids}
+        try:
+            pipe = redis_cache.redis_client.pipeline()
+            pipe.hmget(self.PENDING_KEY, ids)
+            pipe.hmget(self.FLUSHING_KEY, ids)
+            pending, flushing = pipe.execute()
+            for article_id, p, f in zip(ids, pending, flushing):
+                result[article_id] += int(p or 0) + int(f or 0)
+        except Exception as e:
+            logger.warning(f"Failed to read pending views from Redis: {str(e)}")
+        return result
+
+    def _restore(self, deltas: Dict[int, int]) -> None:
+        """把未能写库的Redis增量放回pending，Redis不可用时放入进程内缓冲"""
+        try:
+            pipe = redis_cache.redis_client.pipeline()
+            for article_id, delta in deltas.items():
+                pipe.hincrby(self.PENDING_KEY, article_id, delta)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to restore views to Redis, using local buffer: {str(e)}")
+            with self._lock:
+                for article_id, delta in deltas.items():
+                    self._local[article_id] += delta
+
+    def flush(self) -> int:
+        """将缓冲的浏览增量批量写回数据库，返回写回的文章数"""
+        with self._lock:
+            local_deltas, self._local = dict(self._local), defaultdict(int)
+
+        redis_deltas: Dict[int, int] = {}
+        flush_lock = None
+        try:
+            flush_lock = redis_cache.redis_client.lock(
+                self.LOCK_KEY, timeout=max(settings.VIEW_COUNT_FLUSH_INTERVAL * 3, 30)
+            )
+            if flush_lock.acquire(blocking=False):
+                # 上次写回失败时残留的flushing数据优先处理，否则把pending整体切换为flushing
+                if not redis_cache.redis_client.exists(self.FLUSHING_KEY):
+                    if redis_cache.redis_client.exists(self.PENDING_KEY):
+                        redis_cache.redis_client.rename(self.PENDING_KEY, self.FLUSHING_KEY)
+                redis_deltas = {
+                    int(k): int(v)
+                    for k, v in redis_cache.redis_client.hgetall(self.FLUSHING_KEY).items()
+                }
+            else:
+                flush_lock = None
+        except Exception as e:
+            logger.warning(f"Failed to drain view buffer from Redis: {str(e)}")
+            flush_lock = None
+
+        deltas: Dict[int, int] = defaultdict(int)
+        for source in (redis_deltas, local_deltas):
+            for article_id, delta in source.items():
+                deltas[article_id] += delta
+
+        handed_off = committed = False
+        try:
+            if deltas:
+                with get_db_session() as db:
+                    crud_article.article.add_views(db, deltas=deltas)
+                    if redis_deltas:
+                        # 在提交前删除flushing数据：提交后进程退出或Redis故障时不会重复累加，
+                        # 提交失败时再放回pending
+                        redis_cache.redis_client.delete(self.FLUSHING_KEY)
+                        handed_off = True
+                committed = True
+                # 详情缓存中的浏览量已过期，删除后由下次读取重建
+                crud_article.article.invalidate_detail_cache(*deltas)
+            return len(deltas)
+        except Exception:
+            if committed:
+                raise
+            # 写库失败时把本地增量放回缓冲，已删除的Redis增量放回pending，
+            # 未删除的flushing数据留待下次重试
+            with self._lock:
+                for article_id, delta in local_deltas.items():
+                    self._local[article_id] += delta
+            if handed_off:
+                self._restore(redis_deltas)
+            raise
+        finally:
+            if flush_lock is not None:
+                try:
+                    flush_lock.release()
+                except Exception:
+                    pass
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.VIEW_COUNT_FLUSH_INTERVAL)
+            try:
+                flushed = await asyncio.to_thread(self.flush)
+                if flushed:
+                    logger.debug(f"Flushed buffered views for {flushed} articles")
+            except Exception as e:
+                logger.exception(f"Failed to flush buffered views: {str(e)}")
+
+    def start(self):
+        """启动后台写回任务"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止后台写回任务，并把剩余增量写回数据库"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception as e:
+            logger.exception(f"Failed to flush buffered views on shutdown: {str(e)}")
+
+# 创建全局浏览量缓冲实例
+view_counter = ViewCounter()
@@ -0,0 +1,88 @@
+import random
+import re
+from typing import List, Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.visit_writer import visit_writer
+
+_bot_user_agent = re.compile(settings.VISIT_BOT_USER_AGENT_PATTERN, re.IGNORECASE)
+# 记录访问的路径，为空时只记录文章详情页
+_tracked_paths = [
+    re.compile(pattern)
+    for pattern in settings.VISIT_TRACK_PATTERNS or [rf"^{re.escape(settings.API_V1_STR)}/articles/\d+/?$"]
+]
+# 允许客户端上报的前端路由
+_reportable_paths = [re.compile(pattern) for pattern in settings.VISIT_REPORT_PATTERNS]
+
+
+def is_bot(user_agent: Optional[str]) -> bool:
+    """没有User-Agent或User-Agent像爬虫、脚本的请求不计入访问"""
+    return not user_agent or bool(_bot_user_agent.search(user_agent))
+
+
+def is_tracked_path(path: str) -> bool:
+    """路径是否匹配配置的记录访问路由（VISIT_TRACK_PATTERNS）"""
+    return any(pattern.match(path) for pattern in _tracked_paths)
+
+
+def is_reportable_path(path: str) -> bool:
+    """
+    路径是否允许客户端上报（VISIT_REPORT_PATTERNS）
+
+    中间件已自动记录的路由不接受上报，避免同一次访问被记录两次
+    """
+    return any(pattern.match(path) for pattern in _reportable_paths) and not is_tracked_path(path)
+
+
+class VisitTrackingMiddleware:
+    """
+    自动记录页面访问的ASGI中间件
+
+    只记录匹配配置路由（默认为文章详情页）的成功GET请求，按采样率抽样并过滤爬虫，
+    在响应开始时把访问记录交给批量写入任务（只入队，不等待写入），队列满时直接丢弃。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        patterns: Optional[List[str]] = None,
+        sample_rate: Optional[float] = None
+    ):
+        self.app = app
+        self.patterns = [re.compile(pattern) for pattern in patterns] if patterns else _tracked_paths
+        self.sample_rate = settings.VISIT_TRACK_SAMPLE_RATE if sample_rate is None else sample_rate
+
+    def _should_track(self, scope: Scope) -> bool:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return False
+        path = scope["path"]
+        if not any(pattern.match(path) for pattern in self.patterns):
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not settings.VISIT_TRACK_ENABLED or not self._should_track(scope):
+            await self.app(scope, receive, send)
+            return
+
+        user_agent = None
+        for name, value in scope["headers"]:
+            if name == b"user-agent":
+                user_agent = value.decode("latin-1")
+                break
+        if is_bot(user_agent):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and 200 <= message["status"] < 300:
+                client = scope.get("client")
+                visit_writer.submit(
+                    ip=client[0] if client else "Unknown",
+                    user_agent=user_agent,
+                    path=scope["path"]
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
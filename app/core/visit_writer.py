@@ -0,0 +1,116 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.unique_visitors import unique_visitors
+from app.crud import crud_visit
+from app.db.session import get_db_session
+
+
+class VisitWriter:
+    """
+    访问记录批量写入
+
+    请求只把原始访问信息放入进程内有界队列后立即返回，后台任务按数量或时间凑批，
+    补充地理位置等信息后用一条executemany批量插入。队列满时拒绝新的访问记录（背压），
+    应用关闭时把队列中剩余的记录全部写入。
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # 正在凑的批次（已出队、尚未开始写入）
+        self._batch: List[Dict[str, Any]] = []
+        self._accepting = False
+
+    def submit(self, *, ip: str, user_agent: Optional[str], path: Optional[str]) -> bool:
+        """提交一条访问记录，队列已满（或写入任务未启动）时返回False"""
+        if not self._accepting:
+            return False
+        try:
+            self._queue.put_nowait({
+                "ip": ip,
+                "user_agent": user_agent,
+                "path": path,
+                "created_at": datetime.now(),
+            })
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """补充访问信息并批量写入数据库"""
+        rows = [
+            {
+                "ip": item["ip"][:50],
+                "location": crud_visit.visit.get_location_by_ip(item["ip"]),
+                "user_agent": (item["user_agent"] or "Unknown")[:500],
+                "path": (item["path"] or "")[:200],
+                "created_at": item["created_at"],
+            }
+            for item in batch
+        ]
+        with get_db_session() as db:
+            crud_visit.visit.create_many(db, rows=rows)
+        try:
+            unique_visitors.add(rows)
+        except Exception as e:
+            # 访问记录已写入，独立访客数只是估算，失败时不影响本批
+            logger.warning(f"Failed to update unique visitors: {str(e)}")
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except Exception as e:
+            # 访问记录只用于统计，写入失败时丢弃该批，避免阻塞后续记录
+            logger.exception(f"Failed to write {len(batch)} visits: {str(e)}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _run(self):
+        while True:
+            self._batch.append(await self._queue.get())
+            deadline = time.monotonic() + settings.VISIT_FLUSH_INTERVAL
+            # 不用wait_for等待队列：其在取消与取到元素同时发生时可能吞掉取消
+            while len(self._batch) < settings.VISIT_BATCH_SIZE:
+                while not self._queue.empty() and len(self._batch) < settings.VISIT_BATCH_SIZE:
+                    self._batch.append(self._queue.get_nowait())
+                remaining = deadline - time.monotonic()
+                if len(self._batch) >= settings.VISIT_BATCH_SIZE or remaining <= 0:
+                    break
+                await asyncio.sleep(min(remaining, 0.05))
+            batch, self._batch = self._batch, []
+            await self._flush(batch)
+
+    def start(self):
+        """启动后台写入任务"""
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=settings.VISIT_QUEUE_SIZE)
+            self._task = asyncio.create_task(self._run())
+            self._accepting = True
+
+    async def stop(self):
+        """停止接收访问记录，并把队列中剩余的记录写入数据库"""
+        if self._task is None:
+            return
+        self._accepting = False
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        # 写入被取消时正在凑的批次和队列中剩余的记录
+        batch, self._batch = self._batch, []
+        while batch or not self._queue.empty():
+            while not self._queue.empty() and len(batch) < settings.VISIT_BATCH_SIZE:
+                batch.append(self._queue.get_nowait())
+            await self._flush(batch)
+            batch = []
+
+# 创建全局访问记录写入实例
+visit_writer = VisitWriter()
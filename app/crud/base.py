@@ -1,7 +1,11 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from datetime import datetime
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_, text
+from sqlalchemy.orm import Query, Session
+from app.core.cache import redis_cache
+from app.core.config import settings
 from app.db.session import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -22,9 +26,76 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return db.query(self.model).filter(self.model.id == id).first()
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self, db: Session, *, skip: int = 0, limit: int = 100, after_id: Optional[int] = None
     ) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        """
+        获取记录列表
+
+        :param after_id: 如果指定，则按id游标分页，返回id大于该值的记录，忽略skip
+        """
+        query = db.query(self.model)
+        if after_id is not None:
+            return query.filter(self.model.id > after_id).order_by(self.model.id).limit(limit).all()
+        return query.order_by(self.model.id).offset(skip).limit(limit).all()
+
+    def apply_keyset(self, query: Query, after: Optional[Tuple[datetime, int]]) -> Query:
+        """
+        按(created_at, id)倒序进行游标分页：只取排在游标之后的记录
+        """
+        query = query.order_by(self.model.created_at.desc(), self.model.id.desc())
+        if after is not None:
+            created_at, id = after
+            query = query.filter(
+                or_(
+                    self.model.created_at < created_at,
+                    and_(self.model.created_at == created_at, self.model.id < id),
+                )
+            )
+        return query
+
+    def count_total(
+        self, db: Session, query: Query, *, mode: str = "exact",
+        cache_namespace: Optional[str] = None, cache_params: Optional[Dict[str, Any]] = None
+    ) -> Optional[int]:
+        """
+        按指定策略统计总数，query为COUNT查询
+
+        - exact: 精确统计
+        - cached: 按过滤条件缓存精确统计结果，写操作递增命名空间版本号使其失效
+        - estimated: 基于EXPLAIN的行数估算，不扫描数据
+        - none: 不统计，返回None
+        """
+        if mode == "none":
+            return None
+        if mode == "estimated":
+            return self.estimate_count(db, query)
+        if mode == "cached" and cache_namespace:
+            key = redis_cache.versioned_key(cache_namespace, "count", cache_params)
+            total = redis_cache.get(key)
+            if total is None:
+                total = query.scalar()
+                redis_cache.set(key, total, expire=settings.COUNT_CACHE_EXPIRE)
+            return total
+        return query.scalar()
+
+    def estimate_count(self, db: Session, query: Query) -> int:
+        """
+        通过EXPLAIN的行数估算结果集大小；估算不可用时退回表统计信息中的行数
+        """
+        compiled = query.statement.compile(
+            dialect=db.get_bind().dialect, compile_kwargs={"render_postcompile": True}
+        )
+        params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+        plan = db.connection().exec_driver_sql(f"EXPLAIN {compiled}", params).mappings().first()
+        if plan and plan["rows"] is not None:
+            return int(plan["rows"] * float(plan.get("filtered") or 100) / 100)
+        return db.execute(
+            text(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"
+            ),
+            {"table_name": self.model.__tablename__},
+        ).scalar() or 0
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
@@ -1,11 +1,92 @@
-from typing import List, Optional
+import unicodedata
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import case, delete, false, func, insert, select, update
+from sqlalchemy.dialects.mysql import match
+from app.core.cache import redis_cache
+from app.core.config import settings
+from app.core.logger import logger
+from app.crud import fulltext
 from app.crud.base import CRUDBase
 from app.models.article import Article
-from app.schemas.article import ArticleCreate, ArticleUpdate, ArticleQueryParams
+from app.models.article_tag import ArticleTag
+from app.schemas.article import ArticleCreate, ArticleUpdate, ArticleQueryParams, Article as ArticleSchema
 
 class CRUDArticle(CRUDBase[Article, ArticleCreate, ArticleUpdate]):
+    # 摘要列表中正文摘录的最大长度
+    EXCERPT_MAX_LENGTH = 500
+    # 文章列表缓存（如总数缓存）的命名空间，文章写操作时递增其版本号
+    CACHE_NAMESPACE = "articles"
+
+    def detail_cache_key(self, article_id: int) -> str:
+        """
+        文章详情缓存键
+        """
+        return f"article:detail:{article_id}"
+
+    def get_detail(self, db: Session, *, id: int) -> Optional[Dict[str, Any]]:
+        """
+        读穿缓存获取文章详情，返回ArticleSchema序列化后的数据
+        """
+        key = self.detail_cache_key(id)
+        data = redis_cache.get(key)
+        if data is None:
+            db_obj = self.get(db, id=id)
+            if db_obj is None:
+                return None
+            data = self.refresh_detail_cache(db_obj)
+        return data
+
+    def get_many(self, db: Session, *, ids: List[int]) -> List[Article]:
+        """
+        通过一条 WHERE id IN (...) 查询批量获取文章
+        """
+        if not ids:
+            return []
+        return db.query(self.model).filter(Article.id.in_(ids)).all()
+
+    def get_details(self, db: Session, *, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        批量读穿缓存获取文章详情：先MGET缓存，未命中的文章一次查库并回填缓存
+
+        :return: 文章ID到ArticleSchema序列化数据的映射，不存在的文章不包含在内
+        """
+        cached = redis_cache.get_many([self.detail_cache_key(i) for i in ids])
+        result = {i: data for i, data in zip(ids, cached) if data is not None}
+        missing = [i for i in ids if i not in result]
+        if missing:
+            fresh = {
+                db_obj.id: ArticleSchema.model_validate(db_obj).model_dump(mode="json")
+                for db_obj in self.get_many(db, ids=missing)
+            }
+            redis_cache.set_many(
+                {self.detail_cache_key(i): data for i, data in fresh.items()},
+                expire=settings.ARTICLE_CACHE_EXPIRE
+            )
+            result.update(fresh)
+        return result
+
+    def refresh_detail_cache(self, db_obj: Article) -> Dict[str, Any]:
+        """
+        用文章最新数据重建详情缓存
+        """
+        data = ArticleSchema.model_validate(db_obj).model_dump(mode="json")
+        redis_cache.set(self.detail_cache_key(db_obj.id), data, expire=settings.ARTICLE_CACHE_EXPIRE)
+        return data
+
+    def invalidate_detail_cache(self, *article_ids: int) -> None:
+        """
+        删除文章详情缓存
+        """
+        if not article_ids:
+            return
+        try:
+            redis_cache.redis_client.delete(*(self.detail_cache_key(i) for i in article_ids))
+        except Exception as e:
+            logger.error(f"Error deleting article detail cache: {str(e)}")
+
     def get_by_title(self, db: Session, *, title: str) -> Optional[Article]:
         """
         通过标题获取文章
@@ -21,10 +102,74 @@ class CRUDArticle(CRUDBase[Article, ArticleCreate, ArticleUpdate]):
         obj_in_data = obj_in.dict()
         db_obj = Article(**obj_in_data, author_id=author_id)
         db.add(db_obj)
+        db.flush()
+        self.sync_tags(db, article_id=db_obj.id, tags=db_obj.tags)
         db.commit()
         db.refresh(db_obj)
+        redis_cache.bump_version(self.CACHE_NAMESPACE)
+        self.refresh_detail_cache(db_obj)
+        return db_obj
+
+    def update(
+        self, db: Session, *, db_obj: Article, obj_in: Union[ArticleUpdate, Dict[str, Any]]
+    ) -> Article:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        # 标签索引与文章更新在同一事务中提交
+        if "tags" in update_data:
+            self.sync_tags(db, article_id=db_obj.id, tags=update_data["tags"])
+        db_obj = super().update(db, db_obj=db_obj, obj_in=update_data)
+        redis_cache.bump_version(self.CACHE_NAMESPACE)
+        self.refresh_detail_cache(db_obj)
         return db_obj
 
+    def remove(self, db: Session, *, id: int) -> Article:
+        obj = super().remove(db, id=id)
+        redis_cache.bump_version(self.CACHE_NAMESPACE)
+        self.invalidate_detail_cache(id)
+        return obj
+
+    def tag_key(self, tag: str) -> str:
+        """
+        标签去重键：article_tags.tag使用不区分大小写和重音的排序规则，
+        "Python"与"python"、"café"与"cafe"视为同一标签
+        """
+        decomposed = unicodedata.normalize("NFKD", tag.casefold())
+        return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+    def sync_tags(self, db: Session, *, article_id: int, tags: Optional[List[str]]) -> None:
+        """
+        重建文章的标签索引，不提交事务
+        """
+        db.execute(delete(ArticleTag).where(ArticleTag.article_id == article_id))
+        unique_tags: Dict[str, str] = {}
+        for tag in tags or []:
+            tag = (tag or "").strip()
+            if tag:
+                unique_tags.setdefault(self.tag_key(tag), tag)
+        if unique_tags:
+            db.execute(
+                insert(ArticleTag),
+                [{"article_id": article_id, "tag": tag} for tag in unique_tags.values()]
+            )
+
+    def get_tag_counts(self, db: Session, *, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        获取标签及其已发布文章数，按文章数倒序（标签云）
+        """
+        rows = (
+            db.query(ArticleTag.tag, func.count(ArticleTag.article_id).label("count"))
+            .join(Article, Article.id == ArticleTag.article_id)
+            .filter(Article.status == "published")
+            .group_by(ArticleTag.tag)
+            .order_by(func.count(ArticleTag.article_id).desc(), ArticleTag.tag)
+            .limit(limit)
+            .all()
+        )
+        return [{"tag": tag, "count": count} for tag, count in rows]
+
     def get_multi_by_author(
         self, db: Session, *, author_id: int, skip: int = 0, limit: int = 100
     ) -> List[Article]:
@@ -36,56 +181,126 @@ class CRUDArticle(CRUDBase[Article, ArticleCreate, ArticleUpdate]):
             .all()
         )
 
-    def get_multi_by_params(
-        self, db: Session, *, params: ArticleQueryParams
-    ) -> List[Article]:
-        query = db.query(self.model)
-        
-        # 应用过滤条件
+    def _apply_filters(self, query, params: ArticleQueryParams):
+        """
+        应用文章列表的过滤条件
+        """
         if params.category:
             query = query.filter(Article.category == params.category)
         if params.status:
             query = query.filter(Article.status == params.status)
-        if params.search:
-            search = f"%{params.search}%"
+        if params.tag:
+            # 走标签索引表，不解析JSON列
             query = query.filter(
-                or_(
-                    Article.title.like(search),
-                    Article.content.like(search)
-                )
+                Article.id.in_(select(ArticleTag.article_id).where(ArticleTag.tag == params.tag))
             )
+        if params.search:
+            # 走全文索引（ngram解析器，支持中文）
+            query = query.filter(self._search_relevance(params.search))
+        return query
+
+    def _search_relevance(self, search: str):
+        """
+        全文检索相关度：MATCH(title, content) AGAINST(:search)
+        """
+        if fulltext.is_short_term(search):
+            # 短于ngram分词长度的关键词按前缀通配检索，命中所有以该字符开头的分词；
+            # 只有运算符的关键词不匹配任何文章
+            term = fulltext.boolean_prefix_term(search)
+            if term is None:
+                return false()
+            return match(Article.title, Article.content, against=term).in_boolean_mode()
+        return match(Article.title, Article.content, against=search)
+
+    def _paginate(
+        self, query, params: ArticleQueryParams,
+        after: Optional[Tuple[datetime, int]], limit: Optional[int]
+    ):
+        """
+        为文章列表查询应用排序和分页
+        """
+        limit = limit or params.per_page
+
+        # 搜索时按相关度排序
+        if params.search:
+            query = query.order_by(self._search_relevance(params.search).desc(), Article.id.desc())
+        else:
+            query = self.apply_keyset(query, after)
+            if after is not None:
+                return query.limit(limit)
         
         # 计算分页
         skip = (params.page - 1) * params.per_page
         
-        return query.offset(skip).limit(params.per_page).all()
+        return query.offset(skip).limit(limit)
+
+    def get_multi_by_params(
+        self, db: Session, *, params: ArticleQueryParams,
+        after: Optional[Tuple[datetime, int]] = None, limit: Optional[int] = None
+    ) -> List[Article]:
+        """
+        获取文章列表
+
+        :param after: 如果指定，则按(created_at, id)游标分页，忽略page参数；搜索结果按相关度排序，不支持游标
+        :param limit: 返回的最大记录数，默认为per_page（可多取一条用于判断是否还有下一页）
+        """
+        query = self._apply_filters(db.query(self.model), params)
+        return self._paginate(query, params, after, limit).all()
+
+    def get_summaries_by_params(
+        self, db: Session, *, params: ArticleQueryParams,
+        after: Optional[Tuple[datetime, int]] = None, limit: Optional[int] = None
+    ) -> List[Row]:
+        """
+        获取文章摘要列表：只查询列表需要的列，不加载正文
+
+        :param params: excerpt_length大于0时额外返回截断后的正文摘录
+        """
+        columns = [
+            Article.id, Article.title, Article.category, Article.tags, Article.status,
+            Article.views, Article.comment_count, Article.author_id, Article.created_at, Article.updated_at,
+        ]
+        excerpt_length = min(params.excerpt_length, self.EXCERPT_MAX_LENGTH)
+        if excerpt_length > 0:
+            columns.append(func.left(Article.content, excerpt_length).label("excerpt"))
+        query = self._apply_filters(db.query(*columns), params)
+        return self._paginate(query, params, after, limit).all()
 
-    def get_total_count(self, db: Session, *, params: Optional[ArticleQueryParams] = None) -> int:
-        query = db.query(self.model)
+    def get_total_count(
+        self, db: Session, *, params: Optional[ArticleQueryParams] = None, mode: str = "exact"
+    ) -> Optional[int]:
+        """
+        获取文章总数，mode为总数统计策略，见CRUDBase.count_total
+        """
+        query = db.query(func.count(self.model.id))
         
         if params:
-            if params.category:
-                query = query.filter(Article.category == params.category)
-            if params.status:
-                query = query.filter(Article.status == params.status)
-            if params.search:
-                search = f"%{params.search}%"
-                query = query.filter(
-                    or_(
-                        Article.title.like(search),
-                        Article.content.like(search)
-                    )
-                )
+            query = self._apply_filters(query, params)
+            # 全文检索的EXPLAIN行数没有参考意义，搜索时使用精确统计
+            if mode == "estimated" and params.search:
+                mode = "exact"
         
-        return query.count()
-
-    def increment_views(self, db: Session, *, article_id: int) -> Article:
-        article = self.get(db, id=article_id)
-        if article:
-            article.views += 1
-            db.add(article)
-            db.commit()
-            db.refresh(article)
-        return article
+        return self.count_total(
+            db, query, mode=mode, cache_namespace=self.CACHE_NAMESPACE,
+            cache_params=params.model_dump(include={"category", "status", "tag", "search"}) if params else None
+        )
+
+    def add_views(self, db: Session, *, deltas: Dict[int, int], chunk_size: int = 500) -> None:
+        """
+        批量累加浏览量：UPDATE articles SET views = views + n，每批一条语句
+        """
+        items = list(deltas.items())
+        for i in range(0, len(items), chunk_size):
+            chunk = dict(items[i:i + chunk_size])
+            db.execute(
+                update(Article)
+                .where(Article.id.in_(list(chunk)))
+                .values(
+                    views=func.coalesce(Article.views, 0) + case(chunk, value=Article.id, else_=0),
+                    # 浏览量变化不算内容更新，保持updated_at不变
+                    updated_at=Article.updated_at,
+                )
+                .execution_options(synchronize_session=False)
+            )
 
 article = CRUDArticle(Article)
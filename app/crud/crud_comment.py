@@ -1,33 +1,252 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple, Union
+from sqlalchemy.orm import Session, noload, selectinload
+from sqlalchemy import false, func, select, text, update
+from sqlalchemy.dialects.mysql import match
+from app.core.cache import redis_cache
+from app.core.comment_stream import comment_stream
+from app.core.config import settings
+from app.core.logger import logger
+from app.crud import fulltext
 from app.crud.base import CRUDBase
+from app.crud.crud_article import article as crud_article
+from app.models.article import Article
 from app.models.comment import Comment
-from app.schemas.comment import CommentCreate, CommentUpdate
+from app.schemas.comment import CommentCreate, CommentUpdate, Comment as CommentSchema
 
 class CRUDComment(CRUDBase[Comment, CommentCreate, CommentUpdate]):
+    # 物化路径中每级ID补零后的位数，path列长度决定了最大可支持的层级
+    PATH_SEGMENT_WIDTH = 10
+    # 评论列表缓存（如总数缓存）的命名空间，评论写操作时递增其版本号
+    CACHE_NAMESPACE = "comments"
+
+    def article_cache_namespace(self, article_id: int) -> str:
+        """
+        单篇文章评论缓存的命名空间
+        """
+        return f"{self.CACHE_NAMESPACE}:article:{article_id}"
+
+    def page_cache_key(self, *, article_id: int, params: Dict[str, Any]) -> str:
+        """
+        文章评论分页缓存键，包含文章评论命名空间的版本号
+        """
+        return redis_cache.versioned_key(self.article_cache_namespace(article_id), "page", params)
+
+    def get_cached_page(self, *, key: str) -> Optional[Dict[str, Any]]:
+        """
+        获取缓存的文章评论分页
+        """
+        return redis_cache.get(key)
+
+    def cache_page(self, *, article_id: int, key: str, data: Dict[str, Any]) -> None:
+        """
+        缓存文章评论分页，并记录到文章的分页键集合中
+        """
+        redis_cache.set_tracked(
+            self.article_cache_namespace(article_id), key, data,
+            expire=settings.COMMENT_PAGE_CACHE_EXPIRE
+        )
+
+    def invalidate_cache(self, *article_ids: int) -> None:
+        """
+        评论写操作后使相关缓存失效
+
+        递增文章评论命名空间的版本号即可使该文章所有分页缓存失效，
+        再删除该文章记录过的分页键，及时释放内存
+        """
+        redis_cache.bump_version(self.CACHE_NAMESPACE)
+        for article_id in article_ids:
+            article_namespace = self.article_cache_namespace(article_id)
+            redis_cache.bump_version(article_namespace)
+            redis_cache.delete_tracked(article_namespace)
+        # 文章详情中包含评论数
+        crud_article.invalidate_detail_cache(*article_ids)
+
+    def publish_event(self, event: str, db_obj: Comment) -> None:
+        """
+        向文章评论推送频道发布评论事件（created/approved）
+        """
+        comment_stream.publish(
+            db_obj.article_id, event, CommentSchema.model_validate(db_obj).model_dump(mode="json")
+        )
+
+    def _adjust_counters(
+        self, db: Session, *, article_id: int, parent_id: Optional[int], delta: int, reply_delta: int
+    ) -> None:
+        """
+        原子更新文章评论数和父评论回复数，不提交事务，也不改变updated_at
+        """
+        db.execute(
+            update(Article)
+            .where(Article.id == article_id)
+            .values(comment_count=Article.comment_count + delta, updated_at=Article.updated_at)
+        )
+        if parent_id is not None:
+            db.execute(
+                update(Comment)
+                .where(Comment.id == parent_id)
+                .values(reply_count=Comment.reply_count + reply_delta, updated_at=Comment.updated_at)
+            )
+
+    def path_segment(self, id: int) -> str:
+        """
+        评论在物化路径中的一级
+        """
+        return f"{id:0{self.PATH_SEGMENT_WIDTH}d}/"
+
     def create_with_user(
         self, db: Session, *, obj_in: CommentCreate, user_id: int
     ) -> Comment:
         """
-        创建评论，并设置用户ID
+        创建评论，并设置用户ID和物化路径
         """
         obj_in_data = obj_in.dict()
         db_obj = Comment(**obj_in_data, user_id=user_id)
         db.add(db_obj)
+        db.flush()
+        parent_path, parent_depth = "", -1
+        if db_obj.parent_id is not None:
+            parent_path, parent_depth = (
+                db.query(Comment.path, Comment.depth).filter(Comment.id == db_obj.parent_id).one()
+            )
+        db_obj.path = parent_path + self.path_segment(db_obj.id)
+        db_obj.depth = parent_depth + 1
+        self._adjust_counters(
+            db, article_id=db_obj.article_id, parent_id=db_obj.parent_id, delta=1, reply_delta=1
+        )
         db.commit()
         db.refresh(db_obj)
+        self.invalidate_cache(db_obj.article_id)
+        self.publish_event("created", db_obj)
+        return db_obj
+
+    def update(
+        self, db: Session, *, db_obj: Comment, obj_in: Union[CommentUpdate, Dict[str, Any]]
+    ) -> Comment:
+        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        self.invalidate_cache(db_obj.article_id)
         return db_obj
 
+    def _subtree_filter(self, obj: Comment):
+        """
+        评论子树（含自身）的范围条件：同一文章下路径以该评论路径开头
+
+        路径只包含数字和"/"，无需转义LIKE通配符；前缀匹配可使用(article_id, path)索引范围扫描
+        """
+        return (Comment.article_id == obj.article_id, Comment.path.like(f"{obj.path}%"))
+
+    def get_thread(self, db: Session, *, id: int) -> List[Comment]:
+        """
+        一次范围查询获取评论及其所有后代，按路径排序（即树的先序遍历）
+        """
+        obj = self.get(db, id=id)
+        if obj is None:
+            return []
+        return (
+            db.query(self.model)
+            .filter(*self._subtree_filter(obj))
+            .options(selectinload(Comment.user), noload(Comment.replies))
+            .order_by(Comment.path)
+            .all()
+        )
+
+    def count_thread(self, db: Session, *, obj: Comment) -> int:
+        """
+        一次范围查询统计评论子树（含自身）的评论数
+        """
+        return db.query(func.count(self.model.id)).filter(*self._subtree_filter(obj)).scalar()
+
+    def remove(self, db: Session, *, id: int) -> Comment:
+        """
+        删除评论及其所有后代，并在同一事务中扣减计数
+
+        子树按路径范围统计和删除，不逐层加载回复；路径缺失（尚未运行repair_counters.py）
+        的评论改为按parent_id递归查找子树
+        """
+        obj = (
+            db.query(self.model)
+            .filter(Comment.id == id)
+            .options(selectinload(Comment.user), noload(Comment.replies))
+            .populate_existing()
+            .one()
+        )
+        article_id = obj.article_id
+        if obj.path:
+            subtree = self._subtree_filter(obj)
+            removed = self.count_thread(db, obj=obj)
+        else:
+            # 路径缺失时前缀条件会匹配整篇文章的评论，改用parent_id递归查找子树
+            logger.warning(f"Comment {id} has no materialized path, run repair_counters.py to rebuild paths")
+            subtree_ids = db.execute(text(
+                "WITH RECURSIVE subtree (id) AS ("
+                "SELECT id FROM comments WHERE id = :id "
+                "UNION ALL "
+                "SELECT c.id FROM comments c JOIN subtree s ON c.parent_id = s.id) "
+                "SELECT id FROM subtree"
+            ), {"id": id}).scalars().all()
+            subtree = (Comment.id.in_(subtree_ids),)
+            removed = len(subtree_ids)
+        self._adjust_counters(
+            db, article_id=article_id, parent_id=obj.parent_id, delta=-removed, reply_delta=-1
+        )
+        db.query(self.model).filter(*subtree).delete(synchronize_session=False)
+        # 移出会话，提交后仍可读取已删除评论的数据用于响应
+        db.expunge(obj)
+        db.commit()
+        self.invalidate_cache(article_id)
+        return obj
+
+    def rebuild_paths(self, db: Session) -> None:
+        """
+        根据parent_id递归重建所有评论的物化路径和深度
+        """
+        db.execute(text(
+            "WITH RECURSIVE tree (id, path, depth) AS ("
+            "SELECT id, CAST(CONCAT(LPAD(id, :width, '0'), '/') AS CHAR(255)), 0 "
+            "FROM comments WHERE parent_id IS NULL "
+            "UNION ALL "
+            "SELECT c.id, CONCAT(t.path, LPAD(c.id, :width, '0'), '/'), t.depth + 1 "
+            "FROM comments c JOIN tree t ON c.parent_id = t.id) "
+            "UPDATE comments c JOIN tree t ON t.id = c.id "
+            "SET c.path = t.path, c.depth = t.depth"
+        ), {"width": self.PATH_SEGMENT_WIDTH})
+        db.commit()
+
+    def repair_counters(self, db: Session) -> None:
+        """
+        根据评论表重新计算所有评论的回复数和文章的评论数
+        """
+        db.execute(text(
+            "UPDATE comments c "
+            "LEFT JOIN (SELECT parent_id, COUNT(*) AS n FROM comments "
+            "WHERE parent_id IS NOT NULL GROUP BY parent_id) r ON r.parent_id = c.id "
+            "SET c.reply_count = COALESCE(r.n, 0)"
+        ))
+        db.execute(text(
+            "UPDATE articles a "
+            "LEFT JOIN (SELECT article_id, COUNT(*) AS n FROM comments GROUP BY article_id) c "
+            "ON c.article_id = a.id "
+            "SET a.comment_count = COALESCE(c.n, 0)"
+        ))
+        db.commit()
+        redis_cache.bump_version(self.CACHE_NAMESPACE)
+        redis_cache.delete_pattern(crud_article.detail_cache_key("*"))
+
     def get_multi_by_article(
-        self, db: Session, *, article_id: int, skip: int = 0, limit: int = 100, parent_id: Optional[int] = None
+        self, db: Session, *, article_id: int, skip: int = 0, limit: int = 100, parent_id: Optional[int] = None,
+        after: Optional[Tuple[datetime, int]] = None
     ) -> List[Comment]:
         """
         获取指定文章的评论列表
         
         :param parent_id: 如果指定，则获取指定父评论的回复；如果为None，则获取顶层评论
+        :param after: 如果指定，则按(created_at, id)游标分页，忽略skip
         """
-        query = db.query(self.model).filter(Comment.article_id == article_id)
+        query = (
+            db.query(self.model)
+            .filter(Comment.article_id == article_id)
+            .options(selectinload(Comment.user), noload(Comment.replies))
+        )
         
         if parent_id is None:
             # 获取顶层评论（没有父评论的评论）
@@ -36,84 +255,204 @@ class CRUDComment(CRUDBase[Comment, CommentCreate, CommentUpdate]):
             # 获取指定父评论的回复
             query = query.filter(Comment.parent_id == parent_id)
         
-        return query.order_by(Comment.created_at.desc()).offset(skip).limit(limit).all()
+        query = self.apply_keyset(query, after)
+        if after is not None:
+            return query.limit(limit).all()
+        return query.offset(skip).limit(limit).all()
 
     def get_total_count_by_article(
-        self, db: Session, *, article_id: int, parent_id: Optional[int] = None
-    ) -> int:
+        self, db: Session, *, article_id: int, parent_id: Optional[int] = None, mode: str = "exact"
+    ) -> Optional[int]:
         """
         获取指定文章的评论总数
         
         :param parent_id: 如果指定，则获取指定父评论的回复数；如果为None，则获取顶层评论数
+        :param mode: 总数统计策略，见CRUDBase.count_total；获取回复数时直接读取父评论的回复计数
         """
-        query = db.query(func.count(self.model.id)).filter(Comment.article_id == article_id)
-        
-        if parent_id is None:
-            query = query.filter(Comment.parent_id.is_(None))
-        else:
-            query = query.filter(Comment.parent_id == parent_id)
+        if parent_id is not None:
+            return None if mode == "none" else self.get_reply_count(db, comment_id=parent_id)
+
+        query = db.query(func.count(self.model.id)).filter(
+            Comment.article_id == article_id, Comment.parent_id.is_(None)
+        )
         
-        return query.scalar()
+        return self.count_total(
+            db, query, mode=mode, cache_namespace=self.article_cache_namespace(article_id),
+            cache_params={"parent_id": parent_id}
+        )
 
     def get_reply_count(self, db: Session, *, comment_id: int) -> int:
         """
-        获取指定评论的回复数量
+        获取指定评论的回复数量（读取回复计数）
         """
-        return db.query(func.count(self.model.id)).filter(
-            Comment.parent_id == comment_id
-        ).scalar()
+        return db.query(Comment.reply_count).filter(Comment.id == comment_id).scalar() or 0
 
-    def get_with_replies(
-        self, db: Session, *, comment_id: int, reply_limit: int = 5
-    ) -> Optional[Comment]:
+    def get_latest_replies(
+        self, db: Session, *, parent_ids: List[int], limit: int = 5
+    ) -> Dict[int, List[Comment]]:
         """
-        获取评论及其回复
+        一次窗口查询获取多个父评论各自最新的limit条回复
+
+        :return: 父评论ID到回复列表（按时间倒序）的映射
         """
-        comment = db.query(self.model).filter(self.model.id == comment_id).first()
-        if comment:
-            # 获取最新的几条回复
-            replies = (
-                db.query(self.model)
-                .filter(Comment.parent_id == comment_id)
-                .order_by(Comment.created_at.desc())
-                .limit(reply_limit)
-                .all()
+        if not parent_ids:
+            return {}
+        ranked = (
+            select(
+                Comment.id,
+                func.row_number().over(
+                    partition_by=Comment.parent_id,
+                    order_by=(Comment.created_at.desc(), Comment.id.desc())
+                ).label("rn")
             )
-            setattr(comment, "replies", replies)
-            setattr(comment, "reply_count", len(replies))
-        return comment
+            .where(Comment.parent_id.in_(parent_ids))
+            .subquery()
+        )
+        replies = (
+            db.query(self.model)
+            .join(ranked, ranked.c.id == Comment.id)
+            .filter(ranked.c.rn <= limit)
+            .options(selectinload(Comment.user), noload(Comment.replies))
+            .order_by(Comment.parent_id, Comment.created_at.desc(), Comment.id.desc())
+            .all()
+        )
+        result: Dict[int, List[Comment]] = {}
+        for reply in replies:
+            result.setdefault(reply.parent_id, []).append(reply)
+        return result
+
+    def _content_match(self, content: str):
+        """
+        评论内容全文检索：MATCH(content) AGAINST(:content IN BOOLEAN MODE)
+        """
+        if fulltext.is_short_term(content):
+            # 短于ngram分词长度的关键词按前缀通配检索，只有运算符的关键词不匹配任何评论
+            content = fulltext.boolean_prefix_term(content)
+            if content is None:
+                return false()
+        else:
+            # 整个关键词作为短语匹配，与原来的子串筛选语义一致
+            content = fulltext.boolean_phrase(content)
+        return match(self.model.content, against=content).in_boolean_mode()
+
+    def _apply_filters(
+        self, query, *, status: Optional[str] = None, content: Optional[str] = None,
+        article_id: Optional[int] = None
+    ):
+        """
+        应用评论管理列表的过滤条件
+        """
+        if status:
+            query = query.filter(self.model.status == status)
+        if content:
+            # 走全文索引（ngram解析器），不做LIKE '%x%'全表扫描
+            query = query.filter(self._content_match(content))
+        if article_id is not None:
+            query = query.filter(self.model.article_id == article_id)
+        return query
 
     def get_multi(
         self, db: Session, *, skip: int = 0, limit: int = 100,
-        status: Optional[str] = None, content: Optional[str] = None
+        status: Optional[str] = None, content: Optional[str] = None,
+        after: Optional[Tuple[datetime, int]] = None
     ) -> List[Comment]:
         """
         获取评论列表，支持按状态和内容筛选
+
+        :param after: 如果指定，则按(created_at, id)游标分页，忽略skip
         """
-        query = db.query(self.model)
+        query = db.query(self.model).options(selectinload(Comment.user), noload(Comment.replies))
+        query = self._apply_filters(query, status=status, content=content)
         
-        if status:
-            query = query.filter(self.model.status == status)
-        if content:
-            query = query.filter(self.model.content.ilike(f"%{content}%"))
-        
-        return query.order_by(self.model.created_at.desc()).offset(skip).limit(limit).all()
+        query = self.apply_keyset(query, after)
+        if after is not None:
+            return query.limit(limit).all()
+        return query.offset(skip).limit(limit).all()
 
     def get_total_count(
         self, db: Session, *, status: Optional[str] = None,
-        content: Optional[str] = None
-    ) -> int:
+        content: Optional[str] = None, mode: str = "exact"
+    ) -> Optional[int]:
         """
         获取评论总数，支持按状态和内容筛选
+
+        :param mode: 总数统计策略，见CRUDBase.count_total
         """
         query = db.query(func.count(self.model.id))
+        query = self._apply_filters(query, status=status, content=content)
+        # 全文检索的EXPLAIN行数没有参考意义，按内容筛选时使用精确统计
+        if mode == "estimated" and content:
+            mode = "exact"
         
-        if status:
-            query = query.filter(self.model.status == status)
-        if content:
-            query = query.filter(self.model.content.ilike(f"%{content}%"))
-        
-        return query.scalar()
+        return self.count_total(
+            db, query, mode=mode, cache_namespace=self.CACHE_NAMESPACE,
+            cache_params={"status": status, "content": content}
+        )
+
+    def bulk_review(
+        self, db: Session, *, status: str, ids: Optional[List[int]] = None,
+        filters: Optional[Dict[str, Any]] = None, max_count: int = 10000, chunk_size: int = 500
+    ) -> Dict[int, str]:
+        """
+        批量审核评论：按ID列表或过滤条件分批执行集合UPDATE，每批一个事务
+
+        :param ids: 评论ID列表，与filters二选一
+        :param filters: 过滤条件（status/content/article_id），最多处理max_count条
+        :return: 评论ID到处理结果的映射：updated（已更新）、unchanged（状态未变）、not_found（不存在）
+        """
+        results: Dict[int, str] = {}
+
+        def review_chunk(rows) -> None:
+            changed = [row.id for row in rows if row.status != status]
+            for row in rows:
+                results[row.id] = "updated" if row.status != status else "unchanged"
+            if not changed:
+                return
+            db.execute(
+                update(Comment)
+                .where(Comment.id.in_(changed))
+                .values(status=status)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            # 每批提交后立即失效缓存，后续批次失败时已提交的批次不会继续读到旧缓存；
+            # 审核不改变评论数和回复数
+            self.invalidate_cache(*{row.article_id for row in rows if row.status != status})
+            if status == "approved":
+                approved = (
+                    db.query(self.model)
+                    .filter(Comment.id.in_(changed))
+                    .options(selectinload(Comment.user), noload(Comment.replies))
+                    .all()
+                )
+                for db_obj in approved:
+                    self.publish_event("approved", db_obj)
+
+        columns = (Comment.id, Comment.article_id, Comment.status)
+        if ids is not None:
+            unique_ids = list(dict.fromkeys(ids))[:max_count]
+            for i in range(0, len(unique_ids), chunk_size):
+                chunk = unique_ids[i:i + chunk_size]
+                review_chunk(db.query(*columns).filter(Comment.id.in_(chunk)).all())
+                for comment_id in chunk:
+                    results.setdefault(comment_id, "not_found")
+        else:
+            # 按id游标分批扫描匹配的评论
+            last_id = 0
+            while len(results) < max_count:
+                rows = (
+                    self._apply_filters(db.query(*columns), **(filters or {}))
+                    .filter(Comment.id > last_id)
+                    .order_by(Comment.id)
+                    .limit(min(chunk_size, max_count - len(results)))
+                    .all()
+                )
+                if not rows:
+                    break
+                review_chunk(rows)
+                last_id = rows[-1].id
+
+        return results
 
     def is_admin(self, user) -> bool:
         return user.role == "admin"
@@ -1,20 +1,86 @@
+from datetime import datetime
 from typing import Any, Dict, Optional, Union
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, make_transient_to_detached
 
-from app.core.security import get_password_hash, verify_password
+from app.core.cache import TTLCache, redis_cache
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password, verify_password_async
 from app.crud.base import CRUDBase
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
+    # 认证用户快照包含的列，不缓存密码哈希
+    PRINCIPAL_COLUMNS = ("id", "username", "email", "role", "is_active", "created_at", "updated_at")
+
+    def __init__(self, model):
+        super().__init__(model)
+        self._principals = TTLCache(
+            maxsize=settings.PRINCIPAL_LOCAL_CACHE_SIZE, ttl=settings.PRINCIPAL_LOCAL_CACHE_TTL
+        )
+
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
         return db.query(User).filter(User.email == email).first()
 
-    def create(self, db: Session, *, obj_in: UserCreate) -> User:
+    def principal_cache_key(self, email: str) -> str:
+        """
+        认证用户快照缓存键（以JWT的sub即邮箱为键）
+        """
+        return f"user:principal:{email}"
+
+    def get_principal(self, db: Session, *, email: str) -> Optional[User]:
+        """
+        获取认证用户：依次读取进程内缓存、Redis缓存，都未命中时查库
+
+        缓存命中时用快照重建User并以load=False合并到当前会话，不产生数据库查询；
+        未缓存的列（如hashed_password）在首次访问时再从数据库加载
+        """
+        snapshot = self._principals.get(email)
+        if snapshot is None:
+            snapshot = redis_cache.get(self.principal_cache_key(email))
+            if snapshot is None:
+                db_obj = self.get_by_email(db, email=email)
+                if db_obj is None:
+                    return None
+                snapshot = {
+                    column: getattr(db_obj, column).isoformat()
+                    if isinstance(getattr(db_obj, column), datetime) else getattr(db_obj, column)
+                    for column in self.PRINCIPAL_COLUMNS
+                }
+                redis_cache.set(
+                    self.principal_cache_key(email), snapshot, expire=settings.PRINCIPAL_CACHE_EXPIRE
+                )
+                self._principals.set(email, snapshot)
+                return db_obj
+            self._principals.set(email, snapshot)
+
+        db_obj = User(**{
+            column: datetime.fromisoformat(value)
+            if column in ("created_at", "updated_at") and value else value
+            for column, value in snapshot.items()
+        })
+        make_transient_to_detached(db_obj)
+        return db.merge(db_obj, load=False)
+
+    def invalidate_principal(self, *emails: str) -> None:
+        """
+        用户信息、角色或启用状态变化后删除认证用户缓存
+
+        只能删除本进程的进程内缓存，其他进程在PRINCIPAL_LOCAL_CACHE_TTL内过期
+        """
+        for email in emails:
+            self._principals.delete(email)
+            redis_cache.delete(self.principal_cache_key(email))
+
+    def create(self, db: Session, *, obj_in: UserCreate, hashed_password: Optional[str] = None) -> User:
+        """
+        创建用户，hashed_password为已计算好的密码哈希（如在密码哈希线程池中计算），为空时在此计算
+        """
         db_obj = User(
             email=obj_in.email,
             username=obj_in.username,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=hashed_password or get_password_hash(obj_in.password),
             is_active=True,
         )
         db.add(db_obj)
@@ -23,17 +89,33 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         return db_obj
 
     def update(
-        self, db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
+        self, db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]],
+        hashed_password: Optional[str] = None
     ) -> User:
+        """
+        更新用户，hashed_password为已计算好的新密码哈希（如在密码哈希线程池中计算），
+        为空而obj_in包含密码时在此计算
+        """
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
-        if update_data.get("password"):
-            hashed_password = get_password_hash(update_data["password"])
-            del update_data["password"]
-            update_data["hashed_password"] = hashed_password
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        update_data = dict(update_data)
+        password = update_data.pop("password", None)
+        if password and not hashed_password:
+            hashed_password = get_password_hash(password)
+        if hashed_password:
+            # 直接赋值：基类只更新对象上已加载的字段，认证缓存重建的用户未加载hashed_password
+            db_obj.hashed_password = hashed_password
+        previous_email = db_obj.email
+        db_obj = super().update(db, db_obj=db_obj, obj_in=update_data)
+        self.invalidate_principal(previous_email, db_obj.email)
+        return db_obj
+
+    def remove(self, db: Session, *, id: int) -> User:
+        obj = super().remove(db, id=id)
+        self.invalidate_principal(obj.email)
+        return obj
 
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         user = self.get_by_email(db, email=email)
@@ -43,6 +125,17 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             return None
         return user
 
+    async def authenticate_async(self, db: Session, *, email: str, password: str) -> Optional[User]:
+        """
+        异步验证用户：查库在AnyIO线程池中执行，bcrypt校验在密码哈希线程池中执行
+        """
+        user = await run_in_threadpool(self.get_by_email, db, email=email)
+        if not user:
+            return None
+        if not await verify_password_async(password, user.hashed_password):
+            return None
+        return user
+
     def is_active(self, user: User) -> bool:
         return user.is_active
 
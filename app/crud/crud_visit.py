@@ -1,23 +1,20 @@
-from typing import List, Dict, Any
+from collections import Counter
+from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text
-from datetime import datetime, timedelta
-import requests
+from sqlalchemy import func, insert, literal, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from datetime import date, datetime, timedelta
+from app.core.geoip import geoip
+from app.core.logger import logger
+from app.core.unique_visitors import unique_visitors
 from app.crud.base import CRUDBase
-from app.models.visit import Visit
+from app.models.visit import Visit, VisitDaily, VisitHourly
 from app.schemas.visit import VisitCreate, VisitUpdate
 
 class CRUDVisit(CRUDBase[Visit, VisitCreate, VisitUpdate]):
     def get_location_by_ip(self, ip: str) -> str:
-        """通过 IP 获取地理位置"""
-        try:
-            response = requests.get(f"http://ip-api.com/json/{ip}")
-            data = response.json()
-            if data["status"] == "success":
-                return f"{data['country']}, {data['city']}"
-        except:
-            pass
-        return "Unknown"
+        """通过 IP 获取地理位置（本地GeoIP数据库，不发起网络请求）"""
+        return geoip.lookup(ip)
 
     def create_with_location(self, db: Session, *, obj_in: VisitCreate) -> Visit:
         """创建访问记录并自动获取地理位置"""
@@ -26,57 +23,179 @@ class CRUDVisit(CRUDBase[Visit, VisitCreate, VisitUpdate]):
             ip=obj_in.ip,
             location=location,
             user_agent=obj_in.user_agent,
-            path=obj_in.path
+            path=obj_in.path,
+            created_at=datetime.now()
         )
         db.add(db_obj)
+        self.add_to_rollups(db, rows=[{
+            "path": db_obj.path,
+            "location": db_obj.location,
+            "created_at": db_obj.created_at,
+        }])
         db.commit()
         db.refresh(db_obj)
+        try:
+            unique_visitors.add([{"ip": db_obj.ip, "path": db_obj.path, "created_at": db_obj.created_at}])
+        except Exception as e:
+            logger.warning(f"Failed to update unique visitors: {str(e)}")
         return db_obj
 
-    def get_visit_stats(self, db: Session) -> Dict[str, Any]:
-        """获取访问统计信息"""
+    def create_many(self, db: Session, *, rows: List[Dict[str, Any]]) -> None:
+        """
+        批量插入访问记录（executemany）并累加到汇总表，不提交事务
+        """
+        if rows:
+            db.execute(insert(Visit), rows)
+            self.add_to_rollups(db, rows=rows)
+
+    def add_to_rollups(self, db: Session, *, rows: List[Dict[str, Any]]) -> None:
+        """
+        把一批访问记录按(小时/天, 路径, 地理位置)合并后累加到汇总表
+
+        每张汇总表一条INSERT ... ON DUPLICATE KEY UPDATE，按主键顺序写入，
+        减少多个进程同时累加时的锁冲突
+        """
+        hourly: Counter = Counter()
+        daily: Counter = Counter()
+        for row in rows:
+            created_at = row["created_at"]
+            key = (row.get("path") or "", row.get("location") or "")
+            hourly[(created_at.replace(minute=0, second=0, microsecond=0),) + key] += 1
+            daily[(created_at.date(),) + key] += 1
+
+        for model, counts in ((VisitHourly, hourly), (VisitDaily, daily)):
+            stmt = mysql_insert(model)
+            stmt = stmt.on_duplicate_key_update(visit_count=model.visit_count + stmt.inserted.visit_count)
+            db.execute(stmt, [
+                {"bucket": bucket, "path": path, "location": location, "visit_count": count}
+                for (bucket, path, location), count in sorted(counts.items())
+            ])
+
+    def rebuild_rollups(self, db: Session, *, start_date: date, end_date: date) -> None:
+        """
+        按原始访问记录重新计算[start_date, end_date]内的汇总数据
+
+        用于回填历史数据或修复汇总表，按天分批执行以避免长事务；
+        重建当天的数据时应暂停访问记录写入，否则重建期间写入的记录可能被重复累加
+        """
+        day = start_date
+        while day <= end_date:
+            start = datetime.combine(day, datetime.min.time())
+            end = start + timedelta(days=1)
+            db.query(VisitHourly).filter(
+                VisitHourly.bucket >= start, VisitHourly.bucket < end
+            ).delete(synchronize_session=False)
+            db.query(VisitDaily).filter(VisitDaily.bucket == day).delete(synchronize_session=False)
+
+            # 按别名分组：带参数的表达式在SELECT和GROUP BY中重复出现时，
+            # ONLY_FULL_GROUP_BY模式下MySQL不认为两者相同
+            hour = func.date_format(Visit.created_at, "%Y-%m-%d %H:00:00").label("hour")
+            path = func.coalesce(Visit.path, "").label("visit_path")
+            location = func.coalesce(Visit.location, "").label("visit_location")
+            in_day = (Visit.created_at >= start, Visit.created_at < end)
+            db.execute(insert(VisitHourly).from_select(
+                ["bucket", "path", "location", "visit_count"],
+                db.query(hour, path, location, func.count(Visit.id))
+                .filter(*in_day).group_by(text("hour"), text("visit_path"), text("visit_location")).statement
+            ))
+            db.execute(insert(VisitDaily).from_select(
+                ["bucket", "path", "location", "visit_count"],
+                db.query(literal(day), path, location, func.count(Visit.id))
+                .filter(*in_day).group_by(text("visit_path"), text("visit_location")).statement
+            ))
+            db.commit()
+            day += timedelta(days=1)
+
+    def get_visit_stats(
+        self,
+        db: Session,
+        *,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        granularity: str = "day",
+        path: Optional[str] = None,
+        article_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        获取[start_date, end_date]内的访问统计信息，默认最近7天
+
+        访问量从汇总表读取，开销只与时间范围相关，与原始访问记录数量无关；
+        独立访客数由Redis HyperLogLog估算，path或article_id限定其统计范围
+        """
+        end_date = end_date or date.today()
+        start_date = start_date or end_date - timedelta(days=6)
+        day_range = (VisitDaily.bucket >= start_date, VisitDaily.bucket <= end_date)
+
         # 总访问量
-        total_visits = db.query(func.count(Visit.id)).scalar()
+        total_visits = db.query(
+            func.coalesce(func.sum(VisitDaily.visit_count), 0)
+        ).filter(*day_range).scalar()
 
         # 按地理位置统计
-        visits_by_location = dict(
-            db.query(
-                Visit.location,
-                func.count(Visit.id)
-            ).group_by(Visit.location).all()
-        )
+        visits_by_location = {
+            location: int(count)
+            for location, count in db.query(
+                VisitDaily.location,
+                func.sum(VisitDaily.visit_count)
+            ).filter(*day_range).group_by(VisitDaily.location).all()
+        }
 
         # 按路径统计
-        visits_by_path = dict(
-            db.query(
-                Visit.path,
-                func.count(Visit.id)
-            ).group_by(Visit.path).all()
-        )
+        visits_by_path = {
+            path: int(count)
+            for path, count in db.query(
+                VisitDaily.path,
+                func.sum(VisitDaily.visit_count)
+            ).filter(*day_range).group_by(VisitDaily.path).all()
+        }
 
-        # 最近7天的访问趋势
-        seven_days_ago = datetime.now() - timedelta(days=7)
-        trend_data = db.query(
-            func.date(Visit.created_at).label('date'),
-            func.count(Visit.id).label('count')
-        ).filter(
-            Visit.created_at >= seven_days_ago
-        ).group_by(
-            func.date(Visit.created_at)
-        ).order_by(
-            text('date')
-        ).all()
+        # 访问趋势
+        if granularity == "hour":
+            start = datetime.combine(start_date, datetime.min.time())
+            end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+            trend_data = db.query(
+                VisitHourly.bucket,
+                func.sum(VisitHourly.visit_count)
+            ).filter(
+                VisitHourly.bucket >= start, VisitHourly.bucket < end
+            ).group_by(VisitHourly.bucket).order_by(VisitHourly.bucket).all()
+            fmt = '%Y-%m-%d %H:00'
+        else:
+            trend_data = db.query(
+                VisitDaily.bucket,
+                func.sum(VisitDaily.visit_count)
+            ).filter(*day_range).group_by(VisitDaily.bucket).order_by(VisitDaily.bucket).all()
+            fmt = '%Y-%m-%d'
 
         visits_trend = [
             {
-                'date': date.strftime('%Y-%m-%d'),
-                'count': count
+                'date': bucket.strftime(fmt),
+                'count': int(count)
             }
-            for date, count in trend_data
+            for bucket, count in trend_data
         ]
 
+        # 独立访客数（按天趋势中补充每天的独立访客数）；HyperLogLog只保留
+        # VISIT_UV_RETENTION_DAYS天，范围超出保留期时只统计保留期内的部分
+        scope = {"path": path, "article_id": article_id}
+        unique_start_date = max(start_date, unique_visitors.retained_since())
+        if unique_start_date <= end_date:
+            unique_total = unique_visitors.count(unique_start_date, end_date, **scope)
+        else:
+            unique_start_date = unique_total = None
+        if granularity == "day":
+            daily_unique = unique_visitors.count_daily(start_date, end_date, **scope)
+            if daily_unique is not None:
+                for item in visits_trend:
+                    day = date.fromisoformat(item['date'])
+                    item['unique_visitors'] = daily_unique[(day - start_date).days]
+
         return {
-            "total_visits": total_visits,
+            "start_date": start_date,
+            "end_date": end_date,
+            "total_visits": int(total_visits),
+            "unique_visitors": unique_total,
+            "unique_visitors_start_date": unique_start_date,
             "visits_by_location": visits_by_location,
             "visits_by_path": visits_by_path,
             "visits_trend": visits_trend
@@ -0,0 +1,28 @@
+from typing import Optional
+
+# MySQL全文检索（ngram解析器）检索词的构造，文章和评论检索共用
+
+# 与MySQL的ngram_token_size保持一致，短于该长度的关键词无法直接匹配分词
+MIN_TOKEN_SIZE = 2
+# 布尔模式全文检索的运算符，作为普通字符传入会导致语法错误
+BOOLEAN_OPERATORS = '+-<>()~*"@'
+
+
+def is_short_term(term: str) -> bool:
+    """关键词是否短于ngram分词长度，需要按前缀通配检索"""
+    return len(term) < MIN_TOKEN_SIZE
+
+
+def boolean_prefix_term(term: str) -> Optional[str]:
+    """
+    布尔模式的前缀通配检索词：去掉运算符和空白后加*，不剩任何字符时返回None
+    """
+    term = "".join(char for char in term if char not in BOOLEAN_OPERATORS and not char.isspace())
+    return f"{term}*" if term else None
+
+
+def boolean_phrase(term: str) -> str:
+    """
+    布尔模式的短语检索词：整个关键词作为一个短语匹配
+    """
+    return '"' + term.replace('"', " ") + '"'
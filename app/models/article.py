@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.session import Base
@@ -7,15 +7,28 @@ class Article(Base):
     __tablename__ = "articles"
 
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(200), nullable=False)
+    title = Column(String(200), nullable=False, index=True)
     content = Column(Text, nullable=False)
     category = Column(String(50), nullable=False)
     tags = Column(JSON)  # 存储标签数组
     status = Column(Enum('draft', 'published'), default='draft', nullable=False)
     views = Column(Integer, default=0)
-    author_id = Column(Integer, nullable=False)
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")  # 评论总数（含回复），由CRUDComment维护
+    author_id = Column(Integer, nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # 关联关系
-    comments = relationship("Comment", back_populates="article", cascade="all, delete-orphan")
+    comments = relationship("Comment", back_populates="article", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # 列表默认排序及游标分页
+        Index("ix_articles_created_at_id", "created_at", "id"),
+        # 按分类+状态筛选的列表，同时覆盖排序
+        Index("ix_articles_category_status_created", "category", "status", "created_at", "id"),
+        # 标题+正文全文索引，使用ngram解析器以支持中文检索
+        Index(
+            "ft_articles_title_content", "title", "content",
+            mysql_prefix="FULLTEXT", mysql_with_parser="ngram"
+        ),
+    )
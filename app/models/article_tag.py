@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.db.session import Base
+
+class ArticleTag(Base):
+    """文章标签索引表，与articles.tags保持同步，用于按标签查询和统计"""
+    __tablename__ = "article_tags"
+
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String(50), primary_key=True)
+
+    __table_args__ = (
+        # 按标签查文章、统计标签数量
+        Index("ix_article_tags_tag_article", "tag", "article_id"),
+    )
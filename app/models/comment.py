@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -13,6 +13,10 @@ class Comment(Base):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     parent_id = Column(Integer, ForeignKey("comments.id", ondelete="CASCADE"), nullable=True)
     status = Column(String(20), nullable=False, default="pending")  # pending, approved, rejected
+    reply_count = Column(Integer, nullable=False, default=0, server_default="0")  # 直接回复数，由CRUDComment维护
+    # 物化路径：从顶层评论到本评论的ID（定长补零）以"/"连接，子树即路径前缀相同的评论
+    path = Column(String(255), nullable=False, default="", server_default="")
+    depth = Column(Integer, nullable=False, default=0, server_default="0")  # 顶层评论为0
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -20,4 +24,18 @@ class Comment(Base):
     article = relationship("Article", back_populates="comments")
     user = relationship("User", back_populates="comments")
     parent = relationship("Comment", back_populates="replies", remote_side=[id])
-    replies = relationship("Comment", back_populates="parent", cascade="all, delete-orphan")
+    # 删除时由数据库外键级联删除回复，不把整棵子树加载到内存
+    replies = relationship("Comment", back_populates="parent", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # 文章评论/回复列表：按文章和父评论过滤，按(created_at, id)倒序游标分页
+        Index("ix_comments_article_parent_created", "article_id", "parent_id", "created_at", "id"),
+        # 评论子树（整个讨论串）按路径前缀范围查询
+        Index("ix_comments_article_path", "article_id", "path"),
+        # 管理员审核队列：按状态过滤，按(created_at, id)倒序游标分页
+        Index("ix_comments_status_created", "status", "created_at", "id"),
+        # 不按状态过滤的管理员评论列表排序
+        Index("ix_comments_created_at_id", "created_at", "id"),
+        # 评论内容全文索引，使用ngram解析器以支持中文检索
+        Index("ft_comments_content", "content", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Date
 from sqlalchemy.sql import func
 from app.db.session import Base
 
@@ -10,4 +10,22 @@ class Visit(Base):
     location = Column(String(200))  # 存储IP地理位置信息
     user_agent = Column(String(500))  # 存储用户浏览器信息
     path = Column(String(200))  # 访问的路径
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+class VisitHourly(Base):
+    """按小时汇总的访问量，写入访问记录时增量维护"""
+    __tablename__ = "visit_hourly"
+
+    bucket = Column(DateTime, primary_key=True)  # 整点时间
+    path = Column(String(200), primary_key=True, default="")
+    location = Column(String(200), primary_key=True, default="")
+    visit_count = Column(Integer, nullable=False, default=0)
+
+class VisitDaily(Base):
+    """按天汇总的访问量，写入访问记录时增量维护"""
+    __tablename__ = "visit_daily"
+
+    bucket = Column(Date, primary_key=True)
+    path = Column(String(200), primary_key=True, default="")
+    location = Column(String(200), primary_key=True, default="")
+    visit_count = Column(Integer, nullable=False, default=0)
@@ -1,13 +1,16 @@
-from typing import Optional, List
-from pydantic import BaseModel
+from typing import Literal, Optional, List
+from pydantic import BaseModel, constr
 from datetime import datetime
 
+# 标签，长度与article_tags.tag列一致
+Tag = constr(max_length=50)
+
 # 文章基础模型
 class ArticleBase(BaseModel):
     title: str
     content: str
     category: str
-    tags: List[str]
+    tags: List[Tag]
 
 # 创建文章请求模型
 class ArticleCreate(ArticleBase):
@@ -18,7 +21,7 @@ class ArticleUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
     category: Optional[str] = None
-    tags: Optional[List[str]] = None
+    tags: Optional[List[Tag]] = None
     status: Optional[str] = None
 
 # 文章响应模型
@@ -26,6 +29,7 @@ class Article(ArticleBase):
     id: int
     status: str
     views: int
+    comment_count: int = 0
     author_id: int
     created_at: datetime
     updated_at: datetime
@@ -33,10 +37,44 @@ class Article(ArticleBase):
     class Config:
         from_attributes = True
 
+# 文章摘要响应模型（列表使用，不包含正文）
+class ArticleSummary(BaseModel):
+    id: int
+    title: str
+    category: str
+    tags: Optional[List[str]] = None
+    status: str
+    views: int
+    comment_count: int = 0
+    author_id: int
+    created_at: datetime
+    updated_at: datetime
+    excerpt: Optional[str] = None  # 截断后的正文摘录
+
+    class Config:
+        from_attributes = True
+
+# 标签统计响应模型
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+# 批量获取文章响应模型
+class ArticleBatch(BaseModel):
+    items: List[Article]  # 按请求顺序排列的文章
+    missing: List[int]  # 不存在的文章ID
+
 # 文章列表查询参数模型
 class ArticleQueryParams(BaseModel):
     page: int = 1
     per_page: int = 10
     category: Optional[str] = None
     status: Optional[str] = None
+    tag: Optional[str] = None
     search: Optional[str] = None
+    after: Optional[str] = None  # 游标，传入上一页返回的next_cursor
+    # 总数统计策略：exact精确统计，cached缓存统计，estimated估算，none不统计（只返回has_more）
+    total_mode: Literal["exact", "cached", "estimated", "none"] = "exact"
+    # 列表模式：full返回完整文章，summary只返回摘要字段（不含正文）
+    view: Literal["full", "summary"] = "full"
+    excerpt_length: int = 0  # summary模式下正文摘录长度（最多500字），0表示不返回
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Literal, Optional, List
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -35,6 +35,7 @@ class Comment(CommentBase):
     user: Optional[CommentUser] = None
     replies: Optional[List['Comment']] = []
     reply_count: Optional[int] = 0
+    depth: int = 0  # 评论层级，顶层评论为0
 
     class Config:
         from_attributes = True
@@ -46,3 +47,28 @@ class CommentQueryParams(BaseModel):
     parent_id: Optional[int] = None  # None表示查询顶层评论
     status: Optional[str] = None  # 评论状态筛选
     content: Optional[str] = None  # 评论内容筛选
+    after: Optional[str] = None  # 游标，传入上一页返回的next_cursor
+    # 总数统计策略：exact精确统计，cached缓存统计，estimated估算，none不统计（只返回has_more）
+    total_mode: Literal["exact", "cached", "estimated", "none"] = "exact"
+
+# 批量审核的评论过滤条件
+class CommentReviewFilter(BaseModel):
+    status: Optional[str] = None  # 评论状态筛选
+    content: Optional[str] = None  # 评论内容筛选
+    article_id: Optional[int] = None  # 文章筛选
+
+# 批量审核请求模型，ids与filter二选一
+class CommentBulkReview(BaseModel):
+    status: Literal["approved", "rejected"]
+    ids: Optional[List[int]] = None
+    filter: Optional[CommentReviewFilter] = None
+
+# 单条评论的批量审核结果
+class CommentReviewResult(BaseModel):
+    id: int
+    result: str  # updated（已更新）、unchanged（状态未变）、not_found（不存在）
+
+# 批量审核响应模型
+class CommentBulkReviewResult(BaseModel):
+    updated: int
+    results: List[CommentReviewResult]
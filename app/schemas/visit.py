@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field
+from datetime import date, datetime
 from typing import Optional
 
 class VisitBase(BaseModel):
@@ -11,6 +11,10 @@ class VisitBase(BaseModel):
 class VisitCreate(VisitBase):
     pass
 
+class VisitRecord(BaseModel):
+    """客户端上报的页面访问，path为空时取Referer中的路径"""
+    path: Optional[str] = Field(None, max_length=200)
+
 class VisitUpdate(VisitBase):
     pass
 
@@ -22,7 +26,11 @@ class Visit(VisitBase):
         from_attributes = True
 
 class VisitStats(BaseModel):
+    start_date: date
+    end_date: date
     total_visits: int
+    unique_visitors: Optional[int] = None  # 独立访客数（HyperLogLog估算，Redis不可用时为空）
+    unique_visitors_start_date: Optional[date] = None  # 独立访客数的实际统计开始日期（不早于保留期）
     visits_by_location: dict
     visits_by_path: dict
-    visits_trend: list  # 最近7天的访问趋势
+    visits_trend: list  # 按天或按小时的访问趋势
@@ -0,0 +1,78 @@
+"""
+离线GeoIP查询基准测试
+
+生成一个合成的IP段数据库（或使用 --db 指定真实数据库），测量加载耗时、
+未命中LRU缓存的二分查找耗时和命中缓存的查询耗时。
+
+    python benchmarks/geoip_lookup.py --ranges 500000
+"""
+import argparse
+import csv
+import ipaddress
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def build_database(path: str, ranges: int) -> None:
+    """IPv4地址空间按ranges等分，另加十分之一数量的IPv6段"""
+    step = 2 ** 32 // ranges
+    v6_base, v6_step = int(ipaddress.ip_address("2001::")), 2 ** 80
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ip_start", "ip_end", "country", "city"])
+        for i in range(ranges):
+            writer.writerow([i * step, (i + 1) * step - 1, f"Country{i % 200}", f"City{i % 5000}"])
+        for i in range(ranges // 10):
+            start = v6_base + i * v6_step
+            writer.writerow([str(ipaddress.ip_address(start)), str(ipaddress.ip_address(start + v6_step - 1)),
+                             f"Country{i % 200}", f"City{i % 5000}"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="已有的IP段数据库CSV，不指定时生成合成数据库")
+    parser.add_argument("--ranges", type=int, default=500000)
+    parser.add_argument("--lookups", type=int, default=100000)
+    args = parser.parse_args()
+
+    from app.core.geoip import GeoIPResolver
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or str(Path(tmp) / "geoip.csv")
+        if not args.db:
+            build_database(path, args.ranges)
+
+        resolver = GeoIPResolver(path)
+        start = time.perf_counter()
+        resolver.load()
+        print(f"load: {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(42)
+    v4 = [str(ipaddress.IPv4Address(rng.getrandbits(32))) for _ in range(args.lookups)]
+    v6 = [str(ipaddress.IPv6Address(int(ipaddress.ip_address("2001::")) + rng.getrandbits(96)))
+          for _ in range(args.lookups)]
+
+    for name, ips in (("ipv4", v4), ("ipv6", v6)):
+        start = time.perf_counter()
+        for ip in ips:
+            resolver._lookup(ip)
+        uncached = (time.perf_counter() - start) / len(ips) * 1e6
+
+        hot = ips[:1000]
+        for ip in hot:
+            resolver.lookup(ip)
+        start = time.perf_counter()
+        for _ in range(len(ips) // len(hot)):
+            for ip in hot:
+                resolver.lookup(ip)
+        cached = (time.perf_counter() - start) / (len(ips) // len(hot) * len(hot)) * 1e6
+        print(f"{name}: binary search {uncached:.2f} us/lookup, LRU hit {cached:.2f} us/lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+登录吞吐基准测试
+
+进程内模式（默认）：模拟登录高峰，对比bcrypt校验直接在AnyIO默认线程池中执行
+与在独立密码哈希线程池中执行时，登录吞吐以及同时进行的普通同步接口（文章读取）的延迟。
+
+    python benchmarks/login_throughput.py --logins 200 --concurrency 50
+
+接口模式：对运行中的服务并发调用 POST /auth/login，统计吞吐、延迟和503比例。
+
+    python benchmarks/login_throughput.py --url http://127.0.0.1:8000 --email zs@qq.com --password zs1024
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def run_in_process(mode: str, logins: int, concurrency: int, reads: int) -> None:
+    from fastapi import HTTPException
+    from fastapi.concurrency import run_in_threadpool
+    from app.core import security
+
+    hashed = security.get_password_hash("benchmark-password")
+    semaphore = asyncio.Semaphore(concurrency)
+    rejected = 0
+
+    async def login():
+        nonlocal rejected
+        async with semaphore:
+            try:
+                if mode == "blocking":
+                    await run_in_threadpool(security.verify_password, "benchmark-password", hashed)
+                else:
+                    await security.verify_password_async("benchmark-password", hashed)
+            except HTTPException:
+                rejected += 1
+
+    read_latencies = []
+
+    async def article_reads():
+        # 模拟普通同步接口：在AnyIO默认线程池中执行一个很短的任务
+        for _ in range(reads):
+            start = time.perf_counter()
+            await run_in_threadpool(time.sleep, 0.001)
+            read_latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    reader = asyncio.create_task(article_reads())
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    await reader
+
+    print(f"[{mode}] logins={logins} concurrency={concurrency} elapsed={elapsed:.2f}s "
+          f"throughput={(logins - rejected) / elapsed:.1f}/s rejected(503)={rejected}")
+    print(f"[{mode}] article read latency ms: p50={statistics.median(read_latencies):.1f} "
+          f"p99={percentile(read_latencies, 0.99):.1f} max={max(read_latencies):.1f}")
+    security.shutdown_password_pool()
+
+
+def run_against_server(url: str, email: str, password: str, logins: int, concurrency: int) -> None:
+    body = urllib.parse.urlencode({"username": email, "password": password}).encode()
+    endpoint = f"{url.rstrip('/')}/api/v1/auth/login"
+
+    def login():
+        request = urllib.request.Request(endpoint, data=body, method="POST")
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        return status, (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: login(), range(logins)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for status, latency in results if status == 200]
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    print(f"logins={logins} concurrency={concurrency} elapsed={elapsed:.2f}s "
+          f"throughput={len(latencies) / elapsed:.1f}/s statuses={statuses}")
+    if latencies:
+        print(f"latency ms: p50={statistics.median(latencies):.1f} p99={percentile(latencies, 0.99):.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--reads", type=int, default=100, help="进程内模式下并发的文章读取次数")
+    parser.add_argument("--url", help="对运行中的服务进行测试")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    if args.url:
+        run_against_server(args.url, args.email, args.password, args.logins, args.concurrency)
+        return
+    for mode in ("blocking", "pool"):
+        asyncio.run(run_in_process(mode, args.logins, args.concurrency, args.reads))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,8 +10,15 @@ from app.core.config import settings
 from app.core.logger import logger, catch_exceptions
 from app.core.monitoring import monitor, log_request_performance
 from app.core.cache import redis_cache
+from app.core.view_counter import view_counter
+from app.core.comment_stream import comment_stream
+from app.core.security import shutdown_password_pool
+from app.core.geoip import geoip
+from app.core.visit_writer import visit_writer
+from app.core.visit_tracking import VisitTrackingMiddleware
 from app.api.v1.api import api_router
 from app.db.session import engine, Base, check_database_connection
+import asyncio
 import uvicorn
 import time
 from app.core.cache import cache
@@ -34,11 +41,23 @@ async def lifespan(app: FastAPI):
         logger.info("Database connection successful")
     else:
         logger.error("Database connection failed")
+    # 预先加载GeoIP数据库，避免首个访问请求承担加载耗时
+    await asyncio.to_thread(geoip.load)
+    # 启动浏览量批量写回任务
+    view_counter.start()
+    # 启动访问记录批量写入任务
+    visit_writer.start()
+    # 启动评论推送的Redis订阅
+    comment_stream.start()
     
     yield  # 应用运行
     
     # 关闭事件
     logger.info("Shutting down application...")
+    await comment_stream.stop()
+    await visit_writer.stop()
+    await view_counter.stop()
+    shutdown_password_pool()
 
 app = FastAPI(
     title=settings.API_TITLE,
@@ -65,6 +84,9 @@ app.add_middleware(
 # 添加可信主机中间件
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])
 
+# 添加访问记录中间件（自动记录文章详情等页面的访问）
+app.add_middleware(VisitTrackingMiddleware)
+
 # 添加限速中间件
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
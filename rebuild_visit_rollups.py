@@ -0,0 +1,23 @@
+import argparse
+from datetime import date, timedelta
+from app.db.session import SessionLocal
+from app.crud import crud_visit
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="根据原始访问记录重建访问汇总表")
+    parser.add_argument("--start", type=date.fromisoformat, help="开始日期（YYYY-MM-DD），默认为结束日期前6天")
+    parser.add_argument("--end", type=date.fromisoformat, help="结束日期（YYYY-MM-DD，包含），默认为今天")
+    args = parser.parse_args()
+    end_date = args.end or date.today()
+    start_date = args.start or end_date - timedelta(days=6)
+
+    print(f"Rebuilding visit rollups from {start_date} to {end_date}")
+    db = SessionLocal()
+    try:
+        crud_visit.visit.rebuild_rollups(db, start_date=start_date, end_date=end_date)
+    finally:
+        db.close()
+    print("Visit rollups rebuilt")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from app.db.session import SessionLocal
+from app.crud import crud_comment
+
+def main() -> None:
+    print("Rebuilding comment paths and recomputing comment counters")
+    db = SessionLocal()
+    try:
+        crud_comment.comment.rebuild_paths(db)
+        crud_comment.comment.repair_counters(db)
+    finally:
+        db.close()
+    print("Comment paths and counters rebuilt")
+
+if __name__ == "__main__":
+    main()
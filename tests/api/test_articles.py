@@ -113,6 +113,12 @@ def test_search_articles(client: TestClient, normal_user_token_headers):
     assert len(content["data"]) > 0
     assert any("Python" in article["title"] for article in content["data"])
 
+def test_search_articles_with_boolean_operator(client: TestClient):
+    """测试搜索词只有全文检索运算符时不报错"""
+    for search in ["+", "(", '"', "*"]:
+        response = client.get("/api/v1/articles", params={"search": search})
+        assert response.status_code == 200
+
 def test_filter_articles_by_category(client: TestClient, normal_user_token_headers):
     """测试按分类筛选文章"""
     # 创建一篇特定分类的文章
@@ -130,3 +136,146 @@ def test_filter_articles_by_category(client: TestClient, normal_user_token_heade
     content = response.json()
     assert len(content["data"]) > 0
     assert all(article["category"] == "science" for article in content["data"])
+
+def test_list_articles_with_cursor(client: TestClient, normal_user_token_headers):
+    """测试游标分页获取文章列表"""
+    for i in range(3):
+        data = {
+            "title": f"Cursor Article {i}",
+            "content": "Cursor pagination content",
+            "category": "cursor",
+            "tags": []
+        }
+        client.post("/api/v1/articles", json=data, headers=normal_user_token_headers)
+
+    response = client.get(
+        "/api/v1/articles?category=cursor&per_page=2",
+        headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    first_page = response.json()["data"]
+    assert len(first_page["items"]) == 2
+    assert first_page["next_cursor"]
+
+    response = client.get(
+        f"/api/v1/articles?category=cursor&per_page=2&after={first_page['next_cursor']}",
+        headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    second_page = response.json()["data"]
+    first_ids = {article["id"] for article in first_page["items"]}
+    assert all(article["id"] not in first_ids for article in second_page["items"])
+
+def test_list_articles_with_invalid_cursor(client: TestClient, normal_user_token_headers):
+    """测试使用无效游标"""
+    response = client.get("/api/v1/articles?after=invalid", headers=normal_user_token_headers)
+    assert response.status_code == 400
+    assert "无效的分页游标" in response.json()["detail"]
+
+def test_list_articles_without_total(client: TestClient, normal_user_token_headers):
+    """测试不统计总数的文章列表"""
+    response = client.get(
+        "/api/v1/articles?total_mode=none&per_page=1",
+        headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    content = response.json()["data"]
+    assert content["total"] is None
+    assert "has_more" in content
+
+def test_list_article_summaries(client: TestClient, normal_user_token_headers):
+    """测试获取文章摘要列表"""
+    data = {
+        "title": "Summary Article",
+        "content": "Summary article content that should not be returned in full",
+        "category": "summary",
+        "tags": ["python"]
+    }
+    client.post("/api/v1/articles", json=data, headers=normal_user_token_headers)
+
+    response = client.get(
+        "/api/v1/articles?category=summary&view=summary&excerpt_length=7",
+        headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    items = response.json()["data"]["items"]
+    assert len(items) > 0
+    assert "content" not in items[0]
+    assert items[0]["excerpt"] == "Summary"
+
+def test_filter_articles_by_tag(client: TestClient, normal_user_token_headers):
+    """测试按标签筛选文章和标签统计"""
+    data = {
+        "title": "Tagged Article",
+        "content": "Tagged article content",
+        "category": "technology",
+        "tags": ["fastapi", "python"],
+        "status": "published"
+    }
+    client.post("/api/v1/articles", json=data, headers=normal_user_token_headers)
+    draft = {**data, "title": "Draft Tagged Article", "tags": ["drafttag"], "status": "draft"}
+    client.post("/api/v1/articles", json=draft, headers=normal_user_token_headers)
+
+    response = client.get("/api/v1/articles?tag=fastapi", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    items = response.json()["data"]["items"]
+    assert len(items) > 0
+    assert all("fastapi" in article["tags"] for article in items)
+
+    response = client.get("/api/v1/articles/tags", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    tags = {item["tag"]: item["count"] for item in response.json()["data"]}
+    assert tags.get("fastapi", 0) > 0
+    # 标签统计只包含已发布文章
+    assert "drafttag" not in tags
+
+def test_create_article_with_long_tag(client: TestClient, normal_user_token_headers):
+    """测试标签超过50个字符时返回422"""
+    data = {
+        "title": "Long Tag Article",
+        "content": "Long tag content",
+        "category": "technology",
+        "tags": ["x" * 51]
+    }
+    response = client.post("/api/v1/articles", json=data, headers=normal_user_token_headers)
+    assert response.status_code == 422
+
+def test_batch_get_articles(client: TestClient, normal_user_token_headers):
+    """测试批量获取文章"""
+    ids = []
+    for i in range(2):
+        data = {
+            "title": f"Batch Article {i}",
+            "content": "Batch article content",
+            "category": "technology",
+            "tags": []
+        }
+        response = client.post("/api/v1/articles", json=data, headers=normal_user_token_headers)
+        ids.append(response.json()["data"]["id"])
+
+    request_ids = [ids[1], 99999, ids[0]]
+    response = client.get(
+        f"/api/v1/articles/batch?ids={','.join(map(str, request_ids))}",
+        headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    content = response.json()["data"]
+    assert [article["id"] for article in content["items"]] == [ids[1], ids[0]]
+    assert content["missing"] == [99999]
+
+def test_create_article_with_duplicate_tags(client: TestClient, normal_user_token_headers):
+    """测试大小写或重音不同的重复标签只保留首次出现的写法"""
+    data = {
+        "title": "Duplicate Tag Article",
+        "content": "Duplicate tag content",
+        "category": "technology",
+        "tags": ["DupTag", "duptag", "Résumé", "resume", "DUPTAG"],
+        "status": "published"
+    }
+    response = client.post("/api/v1/articles", json=data, headers=normal_user_token_headers)
+    assert response.status_code == 200
+
+    response = client.get("/api/v1/articles/tags", headers=normal_user_token_headers)
+    tags = {item["tag"]: item["count"] for item in response.json()["data"]}
+    assert tags["DupTag"] == 1 and "duptag" not in tags
+    assert tags["Résumé"] == 1 and "resume" not in tags
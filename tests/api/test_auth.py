@@ -83,3 +83,79 @@ def test_refresh_invalid_token(client: TestClient):
     response = client.post("/api/v1/auth/refresh", json={"refresh_token": "invalid_token"})
     assert response.status_code == 401
     assert "无效的refresh token" in response.json()["detail"]
+
+def test_principal_cache_invalidated_on_update(client: TestClient, normal_user_token_headers):
+    """测试更新用户信息后认证用户缓存失效"""
+    response = client.get("/api/v1/users/me", headers=normal_user_token_headers)
+    assert response.status_code == 200
+
+    response = client.put(
+        "/api/v1/users/me",
+        json={"username": "renameduser"},
+        headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+
+    response = client.get("/api/v1/users/me", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    assert response.json()["data"]["username"] == "renameduser"
+
+def test_refresh_token_rotation(client: TestClient, normal_user):
+    """测试refresh token轮换和重复使用检测"""
+    login_data = {
+        "username": normal_user["email"],
+        "password": "testpass123"
+    }
+    refresh_token = client.post("/api/v1/auth/login", data=login_data).json()["refresh_token"]
+
+    response = client.post("/api/v1/auth/refresh", params={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    new_refresh_token = response.json()["data"]["refresh_token"]
+    assert new_refresh_token != refresh_token
+
+    # 重复使用已轮换的refresh token，整个会话被吊销
+    response = client.post("/api/v1/auth/refresh", params={"refresh_token": refresh_token})
+    assert response.status_code == 401
+    response = client.post("/api/v1/auth/refresh", params={"refresh_token": new_refresh_token})
+    assert response.status_code == 401
+
+def test_logout(client: TestClient, normal_user):
+    """测试退出登录后token失效"""
+    login_data = {
+        "username": normal_user["email"],
+        "password": "testpass123"
+    }
+    tokens = client.post("/api/v1/auth/login", data=login_data).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    response = client.post("/api/v1/auth/logout", headers=headers)
+    assert response.status_code == 200
+
+    response = client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 401
+    response = client.post("/api/v1/auth/refresh", params={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+def test_password_change_with_cached_principal(client: TestClient, normal_user, normal_user_token_headers):
+    """测试认证用户缓存命中时修改密码生效"""
+    # 先访问一次，使后续请求命中认证用户缓存
+    response = client.get("/api/v1/users/me", headers=normal_user_token_headers)
+    assert response.status_code == 200
+
+    response = client.put(
+        "/api/v1/users/me",
+        json={"password": "newpass456"},
+        headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": normal_user["email"], "password": "newpass456"}
+    )
+    assert response.status_code == 200
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": normal_user["email"], "password": "testpass123"}
+    )
+    assert response.status_code == 401
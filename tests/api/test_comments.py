@@ -1,7 +1,10 @@
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
+from app.models.comment import Comment
+
 def test_create_comment(client: TestClient, normal_user_token_headers):
     """测试创建评论"""
     # 先创建一篇文章
@@ -150,3 +153,152 @@ def test_invalid_parent_comment(client: TestClient, normal_user_token_headers):
     )
     assert response.status_code == 404
     assert "父评论不存在" in response.json()["detail"]
+
+def test_comment_counters(client: TestClient, normal_user_token_headers):
+    """测试评论数和回复数计数"""
+    article_data = {
+        "title": "Counter Article",
+        "content": "Counter content",
+        "category": "technology",
+        "tags": []
+    }
+    article_response = client.post("/api/v1/articles", json=article_data, headers=normal_user_token_headers)
+    article_id = article_response.json()["data"]["id"]
+
+    parent = client.post(
+        "/api/v1/comments",
+        json={"content": "Parent comment", "article_id": article_id},
+        headers=normal_user_token_headers
+    ).json()["data"]
+    client.post(
+        "/api/v1/comments",
+        json={"content": "Reply comment", "article_id": article_id, "parent_id": parent["id"]},
+        headers=normal_user_token_headers
+    )
+
+    response = client.get(f"/api/v1/articles/{article_id}", headers=normal_user_token_headers)
+    assert response.json()["data"]["comment_count"] == 2
+    response = client.get(f"/api/v1/comments/article/{article_id}", headers=normal_user_token_headers)
+    assert response.json()["data"]["items"][0]["reply_count"] == 1
+
+    # 删除父评论时连同回复一起扣减
+    client.delete(
+        f"/api/v1/comments/article/{article_id}/comment/{parent['id']}",
+        headers=normal_user_token_headers
+    )
+    response = client.get(f"/api/v1/articles/{article_id}", headers=normal_user_token_headers)
+    assert response.json()["data"]["comment_count"] == 0
+
+def test_bulk_review_comments(client: TestClient, normal_user_token_headers, admin_token_headers):
+    """测试批量审核评论"""
+    article_data = {
+        "title": "Bulk Review Article",
+        "content": "Bulk review content",
+        "category": "technology",
+        "tags": []
+    }
+    article_response = client.post("/api/v1/articles", json=article_data, headers=normal_user_token_headers)
+    article_id = article_response.json()["data"]["id"]
+    comment_ids = [
+        client.post(
+            "/api/v1/comments",
+            json={"content": f"Spam comment {i}", "article_id": article_id},
+            headers=normal_user_token_headers
+        ).json()["data"]["id"]
+        for i in range(2)
+    ]
+
+    response = client.post(
+        "/api/v1/comments/review/bulk",
+        json={"status": "rejected", "ids": comment_ids + [99999]},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 200
+    content = response.json()["data"]
+    assert content["updated"] == 2
+    results = {item["id"]: item["result"] for item in content["results"]}
+    assert results[99999] == "not_found"
+    assert all(results[comment_id] == "updated" for comment_id in comment_ids)
+
+    # 按过滤条件审核，已拒绝的评论不再匹配
+    response = client.post(
+        "/api/v1/comments/review/bulk",
+        json={"status": "approved", "filter": {"article_id": article_id, "status": "pending"}},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["data"]["updated"] == 0
+
+def test_stream_nonexistent_article_comments(client: TestClient, normal_user_token_headers):
+    """测试订阅不存在文章的评论推送"""
+    response = client.get("/api/v1/comments/article/99999/stream", headers=normal_user_token_headers)
+    assert response.status_code == 404
+
+def test_nested_comment_thread(client: TestClient, normal_user_token_headers):
+    """测试多层嵌套回复、讨论串查询和子树删除"""
+    article_data = {
+        "title": "Thread Article",
+        "content": "Thread content",
+        "category": "technology",
+        "tags": []
+    }
+    article_response = client.post("/api/v1/articles", json=article_data, headers=normal_user_token_headers)
+    article_id = article_response.json()["data"]["id"]
+
+    parent_id = None
+    comment_ids = []
+    for i in range(3):
+        response = client.post(
+            "/api/v1/comments",
+            json={"content": f"Thread comment {i}", "article_id": article_id, "parent_id": parent_id},
+            headers=normal_user_token_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["data"]["depth"] == i
+        parent_id = response.json()["data"]["id"]
+        comment_ids.append(parent_id)
+
+    response = client.get(f"/api/v1/comments/{comment_ids[0]}/thread", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    content = response.json()["data"]
+    assert content["total"] == 3
+    assert content["item"]["replies"][0]["replies"][0]["id"] == comment_ids[2]
+
+    # 删除中间层评论时连同其后代一起删除并扣减计数
+    client.delete(
+        f"/api/v1/comments/article/{article_id}/comment/{comment_ids[1]}",
+        headers=normal_user_token_headers
+    )
+    response = client.get(f"/api/v1/comments/{comment_ids[0]}/thread", headers=normal_user_token_headers)
+    assert response.json()["data"]["total"] == 1
+    response = client.get(f"/api/v1/articles/{article_id}", headers=normal_user_token_headers)
+    assert response.json()["data"]["comment_count"] == 1
+
+def test_filter_comments_with_boolean_operator(client: TestClient, admin_token_headers):
+    """测试评论内容筛选词只有全文检索运算符时不报错"""
+    for content in ["+", "(", '"', "-"]:
+        response = client.get("/api/v1/comments", params={"content": content}, headers=admin_token_headers)
+        assert response.status_code == 200
+        assert response.json()["data"]["items"] == []
+
+def test_delete_comment_without_path(client: TestClient, db: Session, normal_user_token_headers):
+    """测试删除缺少物化路径的评论时按parent_id删除子树"""
+    parent = test_create_comment(client, normal_user_token_headers)
+    reply = client.post(
+        "/api/v1/comments",
+        json={"content": "Legacy reply", "article_id": parent["article_id"], "parent_id": parent["id"]},
+        headers=normal_user_token_headers
+    ).json()["data"]
+    # 模拟迁移前未回填路径的评论
+    db.execute(update(Comment).where(Comment.id.in_([parent["id"], reply["id"]])).values(path=""))
+    db.commit()
+
+    response = client.delete(
+        f"/api/v1/comments/article/{parent['article_id']}/comment/{parent['id']}",
+        headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    response = client.get(f"/api/v1/comments/{reply['id']}")
+    assert response.status_code == 404
+    response = client.get(f"/api/v1/articles/{parent['article_id']}", headers=normal_user_token_headers)
+    assert response.json()["data"]["comment_count"] == 0
@@ -0,0 +1,93 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core import visit_tracking
+from app.core.visit_tracking import VisitTrackingMiddleware
+
+BROWSER_HEADERS = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64)"}
+
+def test_create_visit_accepted(client: TestClient):
+    """测试记录访问立即返回202，由后台任务批量写入"""
+    # 进入上下文以执行lifespan，启动访问记录写入任务
+    with client:
+        response = client.post("/api/v1/visits", json={"path": "/"}, headers=BROWSER_HEADERS)
+        assert response.status_code == 202
+        assert response.json()["data"] is None
+
+        # 未提供路径时取Referer中的路径
+        headers = {**BROWSER_HEADERS, "Referer": "https://example.com/?from=share"}
+        response = client.post("/api/v1/visits", headers=headers)
+        assert response.status_code == 202
+
+        response = client.post("/api/v1/visits", headers=BROWSER_HEADERS)
+        assert response.status_code == 400
+
+        # 不匹配记录访问路由的路径被拒绝
+        response = client.post("/api/v1/visits", json={"path": "/random/path"}, headers=BROWSER_HEADERS)
+        assert response.status_code == 400
+
+def test_create_visit_without_writer(client: TestClient):
+    """测试写入任务未运行时拒绝访问记录"""
+    response = client.post("/api/v1/visits", json={"path": "/"}, headers=BROWSER_HEADERS)
+    assert response.status_code == 503
+
+def test_article_view_counted_once(client: TestClient, normal_user_token_headers, monkeypatch):
+    """测试文章详情页访问只由中间件记录一次，客户端重复上报被拒绝"""
+    article_data = {
+        "title": "Visit Article",
+        "content": "Visit content",
+        "category": "technology",
+        "tags": [],
+        "status": "published"
+    }
+    article_id = client.post(
+        "/api/v1/articles", json=article_data, headers=normal_user_token_headers
+    ).json()["data"]["id"]
+
+    submitted = []
+    monkeypatch.setattr(visit_tracking.visit_writer, "submit", lambda **visit: submitted.append(visit) or True)
+    path = f"/api/v1/articles/{article_id}"
+    response = client.get(path, headers={**normal_user_token_headers, **BROWSER_HEADERS})
+    assert response.status_code == 200
+    response = client.post("/api/v1/visits", json={"path": path}, headers=BROWSER_HEADERS)
+    assert response.status_code == 400
+    assert [visit["path"] for visit in submitted] == [path]
+
+def test_visit_tracking_middleware(monkeypatch):
+    """测试中间件只记录匹配路由的成功GET请求并过滤爬虫"""
+    submitted = []
+    monkeypatch.setattr(visit_tracking.visit_writer, "submit", lambda **visit: submitted.append(visit) or True)
+
+    app = FastAPI()
+    app.add_middleware(VisitTrackingMiddleware, patterns=[r"^/articles/\d+$"], sample_rate=1.0)
+
+    @app.get("/articles/{article_id}")
+    def read_article(article_id: int):
+        return {"id": article_id}
+
+    client = TestClient(app)
+    client.get("/articles/1", headers=BROWSER_HEADERS)
+    client.get("/articles/abc", headers=BROWSER_HEADERS)  # 422
+    client.get("/articles/2", headers={"User-Agent": "Googlebot/2.1"})
+    client.get("/other", headers=BROWSER_HEADERS)
+    assert [visit["path"] for visit in submitted] == ["/articles/1"]
+
+def test_visit_stats(client: TestClient, admin_token_headers):
+    """测试按日期范围获取访问统计"""
+    response = client.get(
+        "/api/v1/visits/stats",
+        params={"start_date": "2024-01-01", "end_date": "2024-01-07"},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 200
+    content = response.json()["data"]
+    assert content["total_visits"] == 0
+    assert "unique_visitors" in content
+    # 整个范围早于独立访客保留期
+    assert content["unique_visitors_start_date"] is None
+
+    response = client.get(
+        "/api/v1/visits/stats",
+        params={"start_date": "2020-01-01", "end_date": "2024-01-01"},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 400
@@ -5,8 +5,9 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 import pytest
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 from backend.main import app
@@ -59,3 +60,41 @@ def normal_user(client: TestClient, db):
     user_in = UserCreate(**user_data)
     user = crud_user.create(db, obj_in=user_in)
     return {**user_data, "id": user.id}
+
+@pytest.fixture
+def assert_no_full_scan(db):
+    """
+    检查代码块中执行的所有SELECT语句都能走索引
+
+    用法：
+        with assert_no_full_scan():
+            crud_article.article.get_by_title(db, title="x")
+
+    代码块结束后对每条SELECT执行EXPLAIN，出现type为ALL（全表扫描）的表时测试失败，
+    allow_tables用于声明允许全表扫描的表；派生表（如<derived2>）本身不计入。
+    """
+    @contextmanager
+    def check(allow_tables=()):
+        connection = db.connection()
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append((statement, parameters))
+
+        event.listen(connection.engine, "before_cursor_execute", capture)
+        try:
+            yield
+        finally:
+            event.remove(connection.engine, "before_cursor_execute", capture)
+
+        full_scans = []
+        for statement, parameters in statements:
+            plan = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings().all()
+            for row in plan:
+                table = row["table"] or ""
+                if row["type"] == "ALL" and not table.startswith("<") and table not in allow_tables:
+                    full_scans.append(f"{row['table']}: {statement}")
+        assert not full_scans, "Full table scan detected:\n" + "\n".join(full_scans)
+
+    return check
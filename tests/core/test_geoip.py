@@ -0,0 +1,57 @@
+from app.core.geoip import UNKNOWN_LOCATION, GeoIPResolver
+
+GEOIP_CSV = """\
+start_ip,end_ip,country,city
+# 注释行
+1.0.0.0,1.0.0.255,Australia,Sydney
+16777472,16777727,China,Fuzhou
+::ffff:8.8.8.0,::ffff:8.8.8.255,United States,Mountain View
+2001:db8::,2001:db8::ffff,Testland,-
+10.0.0.0,2001:db8::1,Mismatch,Skipped
+short,row
+"""
+
+def _resolver(tmp_path) -> GeoIPResolver:
+    path = tmp_path / "geoip.csv"
+    path.write_text(GEOIP_CSV, encoding="utf-8")
+    return GeoIPResolver(str(path))
+
+def test_geoip_lookup(tmp_path):
+    """测试CSV中点分地址、整数地址、IPv4映射地址和IPv6段的解析"""
+    resolver = _resolver(tmp_path)
+    assert resolver.lookup("1.0.0.1") == "Australia, Sydney"
+    assert resolver.lookup("1.0.0.255") == "Australia, Sydney"
+    # 16777472-16777727即1.0.1.0-1.0.1.255
+    assert resolver.lookup("1.0.1.128") == "China, Fuzhou"
+    # IPv4映射的段放入IPv4表，按IPv4地址和映射地址都能查到
+    assert resolver.lookup("8.8.8.8") == "United States, Mountain View"
+    assert resolver.lookup("::ffff:8.8.8.8") == "United States, Mountain View"
+    # 城市为"-"时只返回国家
+    assert resolver.lookup("2001:db8::1") == "Testland"
+
+def test_geoip_skipped_rows(tmp_path):
+    """测试表头、注释行、列数不足和起止IP版本不一致的行被跳过"""
+    resolver = _resolver(tmp_path)
+    resolver.load()
+    tables, location_names = resolver._db
+    assert len(tables[4]) == 3
+    assert len(tables[6]) == 1
+    assert "Mismatch, Skipped" not in location_names
+    assert resolver.lookup("10.0.0.1") == UNKNOWN_LOCATION
+    assert resolver.lookup("1.0.2.0") == UNKNOWN_LOCATION
+    assert resolver.lookup("not-an-ip") == UNKNOWN_LOCATION
+
+def test_geoip_missing_file(tmp_path):
+    """测试数据库文件不存在时所有IP解析为Unknown"""
+    resolver = GeoIPResolver(str(tmp_path / "missing.csv"))
+    assert resolver.lookup("1.0.0.1") == UNKNOWN_LOCATION
+    assert resolver.lookup("2001:db8::1") == UNKNOWN_LOCATION
+
+def test_geoip_reload(tmp_path):
+    """测试重新加载后清空查询缓存"""
+    resolver = GeoIPResolver(str(tmp_path / "missing.csv"))
+    assert resolver.lookup("1.0.0.1") == UNKNOWN_LOCATION
+    path = tmp_path / "geoip.csv"
+    path.write_text(GEOIP_CSV, encoding="utf-8")
+    resolver.load(str(path))
+    assert resolver.lookup("1.0.0.1") == "Australia, Sydney"
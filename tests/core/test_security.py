@@ -0,0 +1,67 @@
+import time
+
+import pytest
+from app.core import security
+from app.core.security import JWTError, TokenVerifier
+
+
+def _tamper_signature(token: str) -> str:
+    header, payload, signature = token.split(".")
+    # 修改签名中间的字符，避免只改动末尾的填充位
+    i = len(signature) // 2
+    signature = signature[:i] + ("A" if signature[i] != "A" else "B") + signature[i + 1:]
+    return ".".join((header, payload, signature))
+
+def test_cached_token_expires(monkeypatch):
+    """测试缓存命中的token过期后仍被拒绝（缓存按单调时钟过期，exp按墙上时钟检查）"""
+    verifier = TokenVerifier()
+    token = verifier.encode({"sub": "cached@example.com", "exp": int(time.time()) + 60})
+    assert verifier.decode(token)["sub"] == "cached@example.com"
+
+    now = time.time()
+    monkeypatch.setattr(security.time, "time", lambda: now + 120)
+    with pytest.raises(JWTError):
+        verifier.decode(token)
+
+def test_tampered_token_rejected_after_cache():
+    """测试有效token已缓存后，篡改签名或载荷的token仍需验签并被拒绝"""
+    verifier = TokenVerifier()
+    exp = int(time.time()) + 60
+    token = verifier.encode({"sub": "user@example.com", "exp": exp})
+    assert verifier.decode(token)["sub"] == "user@example.com"
+
+    with pytest.raises(JWTError):
+        verifier.decode(_tamper_signature(token))
+
+    # 沿用有效签名，替换为其他用户的载荷
+    forged_payload = verifier.encode({"sub": "admin@example.com", "exp": exp}).split(".")[1]
+    header, _, signature = token.split(".")
+    with pytest.raises(JWTError):
+        verifier.decode(".".join((header, forged_payload, signature)))
+
+    assert verifier.decode(token)["sub"] == "user@example.com"
+
+def test_decoded_payload_is_copy():
+    """测试修改返回的payload不影响缓存"""
+    verifier = TokenVerifier()
+    token = verifier.encode({"sub": "copy@example.com", "exp": int(time.time()) + 60})
+    verifier.decode(token)["sub"] = "other@example.com"
+    assert verifier.decode(token)["sub"] == "copy@example.com"
+
+def test_pyjwt_errors_converted():
+    """测试PyJWT的验签错误统一转换为JWTError"""
+    pytest.importorskip("jwt")
+    backend = security.PyJWTBackend("HS256", "test-secret", "test-secret")
+    token = backend.encode({"sub": "pyjwt@example.com", "exp": int(time.time()) + 60})
+    assert backend.decode(token)["sub"] == "pyjwt@example.com"
+
+    with pytest.raises(JWTError):
+        backend.decode(_tamper_signature(token))
+    with pytest.raises(JWTError):
+        backend.decode("not-a-token")
+    expired = backend.encode({"sub": "pyjwt@example.com", "exp": int(time.time()) - 10})
+    with pytest.raises(JWTError):
+        backend.decode(expired)
+    other = security.PyJWTBackend("HS256", "other-secret", "other-secret")
+    with pytest.raises(JWTError):
+        other.decode(token)
@@ -0,0 +1,84 @@
+import pytest
+from datetime import datetime
+from sqlalchemy.orm import Session
+
+from app.crud import crud_article, crud_comment, crud_visit
+from app.schemas.article import ArticleCreate, ArticleQueryParams
+from app.schemas.comment import CommentCreate
+
+@pytest.fixture
+def article(db: Session, normal_user):
+    """创建测试文章"""
+    article_in = ArticleCreate(
+        title="Query Plan Article",
+        content="Query plan content",
+        category="technology",
+        tags=["python"],
+        status="published"
+    )
+    return crud_article.article.create_with_author(db, obj_in=article_in, author_id=normal_user["id"])
+
+def test_article_queries_use_indexes(db: Session, article, assert_no_full_scan):
+    """测试文章相关查询不走全表扫描"""
+    with assert_no_full_scan():
+        crud_article.article.get_by_title(db, title=article.title)
+        crud_article.article.get_multi_by_author(db, author_id=article.author_id)
+        for params in [
+            ArticleQueryParams(),
+            ArticleQueryParams(category="technology", status="published"),
+            ArticleQueryParams(tag="python"),
+            ArticleQueryParams(search="Query"),
+        ]:
+            crud_article.article.get_multi_by_params(db, params=params)
+            crud_article.article.get_total_count(db, params=params)
+        crud_article.article.get_tag_counts(db)
+
+def test_comment_queries_use_indexes(db: Session, article, normal_user, assert_no_full_scan):
+    """测试评论相关查询不走全表扫描"""
+    comment = crud_comment.comment.create_with_user(
+        db, obj_in=CommentCreate(content="Query plan comment", article_id=article.id),
+        user_id=normal_user["id"]
+    )
+    with assert_no_full_scan():
+        crud_comment.comment.get_multi_by_article(db, article_id=article.id)
+        crud_comment.comment.get_multi_by_article(db, article_id=article.id, parent_id=comment.id)
+        crud_comment.comment.get_total_count_by_article(db, article_id=article.id)
+        crud_comment.comment.get_reply_count(db, comment_id=comment.id)
+        crud_comment.comment.get_latest_replies(db, parent_ids=[comment.id])
+
+def test_comment_moderation_queries_use_indexes(db: Session, article, normal_user, assert_no_full_scan):
+    """测试管理员评论审核队列不走全表扫描"""
+    crud_comment.comment.create_with_user(
+        db, obj_in=CommentCreate(content="Moderation queue comment", article_id=article.id),
+        user_id=normal_user["id"]
+    )
+    with assert_no_full_scan():
+        for filters in [{}, {"status": "pending"}, {"content": "Moderation"}, {"status": "pending", "content": "queue"}]:
+            crud_comment.comment.get_multi(db, **filters)
+            crud_comment.comment.get_total_count(db, **filters)
+
+def test_comment_thread_queries_use_indexes(db: Session, article, normal_user, assert_no_full_scan):
+    """测试评论讨论串的子树查询走路径索引"""
+    comment = crud_comment.comment.create_with_user(
+        db, obj_in=CommentCreate(content="Thread root", article_id=article.id),
+        user_id=normal_user["id"]
+    )
+    crud_comment.comment.create_with_user(
+        db, obj_in=CommentCreate(content="Thread reply", article_id=article.id, parent_id=comment.id),
+        user_id=normal_user["id"]
+    )
+    with assert_no_full_scan():
+        crud_comment.comment.get_thread(db, id=comment.id)
+        crud_comment.comment.count_thread(db, obj=comment)
+
+def test_visit_stats_queries_use_indexes(db: Session, assert_no_full_scan):
+    """测试访问统计从汇总表按日期范围读取"""
+    now = datetime.now()
+    crud_visit.visit.create_many(db, rows=[
+        {"ip": "127.0.0.1", "location": "Unknown", "user_agent": "pytest", "path": "/", "created_at": now}
+    ])
+    with assert_no_full_scan():
+        for granularity in ("day", "hour"):
+            stats = crud_visit.visit.get_visit_stats(db, granularity=granularity)
+    assert stats["total_visits"] >= 1
+    assert stats["visits_by_path"]["/"] >= 1